@@ -4,20 +4,40 @@ Flask web application for Veo Video Generation with Azure Storage integration.
 This is a refactored version with improved structure, logging, and best practices.
 """
 import os
+import hashlib
 import logging
 import time
-from flask import Flask, render_template, request, jsonify, g
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+import orjson
+from flask import Flask, Response, render_template, request, jsonify, g
+from flask_compress import Compress
 from werkzeug.utils import secure_filename
 
 from config import Config
 from utils.logging_config import setup_logging
 from utils.file_utils import generate_unique_filename, ensure_directory_exists
-from utils.validation import validate_image_file, validate_deck_name
-from utils.azure_utils import upload_to_azure_blob, download_and_upload_video
+from utils.validation import validate_image_file, validate_deck_name, validate_prompt
+from utils.time_utils import now_iso
+from utils.azure_utils import upload_stream_to_azure_blob
+from utils.json_provider import OrjsonProvider
+from utils.cache import (
+    cache,
+    conditional,
+    init_cache,
+    is_success_response,
+    VIDEO_HISTORY_CACHE_KEY,
+    DECKS_CACHE_KEY,
+    DECK_VIDEOS_CACHE_PREFIX,
+)
 from services.storage_service import StorageService
 from services.video_service import VideoService
 from services.deck_service import DeckService
 from services.status_service import StatusService
+from services.task_store import create_task_store
+from services.task_poller import TaskPoller
+from services.deck_poller import DeckPoller
 
 # Initialize logging
 log_level = os.getenv('LOG_LEVEL', 'INFO')
@@ -28,7 +48,9 @@ log_file = os.getenv('LOG_FILE')  # If set, use this file (disables timestamping
 actual_log_file = setup_logging(
     level=log_level,
     log_file=log_file if not use_timestamp else None,
-    use_timestamp=use_timestamp
+    use_timestamp=use_timestamp,
+    max_bytes=int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024)),
+    backup_count=int(os.getenv('LOG_BACKUP_COUNT', 5))
 )
 logger = logging.getLogger(__name__)
 logger.info(f"Logging to: {actual_log_file}")
@@ -42,9 +64,20 @@ except ValueError as e:
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH
 app.config['SECRET_KEY'] = Config.SECRET_KEY
 
+# Compress JSON/HTML responses (history and deck lists grow over time)
+app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/html']
+app.config['COMPRESS_LEVEL'] = 6
+app.config['COMPRESS_MIN_SIZE'] = 1024
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+Compress(app)
+
+# Response cache for read-heavy GET endpoints
+init_cache(app)
+
 # Ensure directories exist
 ensure_directory_exists(Config.UPLOAD_FOLDER)
 ensure_directory_exists('logs')  # For log files
@@ -54,11 +87,26 @@ video_service = VideoService()
 deck_service = DeckService(video_service)
 status_service = StatusService(video_service)
 
-# In-memory storage for pending tasks (in production, consider Redis or database)
-pending_tasks: dict[str, dict] = {}
+# Metadata for in-flight Veo tasks, keyed by task ID
+task_store = create_task_store()
+
+# Background poller for single video tasks (clients read its results)
+task_poller = TaskPoller(video_service, task_store)
+task_poller.start()
+
+# Background poller for generating decks (clients follow /events)
+deck_poller = DeckPoller(status_service, task_store)
+deck_poller.start()
 
-# Flag to prevent multiple simultaneous failed task updates
-_failed_task_update_in_progress = False
+# Lock preventing multiple simultaneous failed task updates (across workers)
+FAILED_TASK_UPDATE_LOCK = 'failed-update'
+FAILED_TASK_UPDATE_LOCK_TTL = 300  # seconds
+
+# Lock/cache key prefix for deduplicating deck generation requests
+GENERATION_DEDUP_PREFIX = 'generate:'
+
+# Seconds between keep-alive comments on idle deck event streams
+DECK_EVENTS_HEARTBEAT = 15
 
 
 # ============================================================================
@@ -70,19 +118,28 @@ def log_request_info():
     """Log all incoming requests with details."""
     g.start_time = time.time()
     
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    
+    # Resolve the request proxy once; log_response_info reuses these
+    g.method = method = request.method
+    g.path = request.path
+    
     # Log request details
-    logger.info(
-        f"[REQUEST] {request.method} {request.path} | "
-        f"IP: {request.remote_addr} | "
-        f"User-Agent: {request.headers.get('User-Agent', 'Unknown')[:50]}"
+    logger.debug(
+        "[REQUEST] %s %s | IP: %s | User-Agent: %s",
+        method,
+        g.path,
+        request.remote_addr,
+        request.headers.get('User-Agent', 'Unknown')[:50]
     )
     
     # Log query parameters if present
     if request.args:
-        logger.debug(f"[QUERY] {dict(request.args)}")
+        logger.debug("[QUERY] %s", dict(request.args))
     
     # Log form data for POST requests (excluding file uploads)
-    if request.method == 'POST' and request.is_json:
+    if method == 'POST' and request.is_json:
         try:
             data = request.get_json(silent=True)
             if data:
@@ -95,7 +152,7 @@ def log_request_info():
                         sanitized_data[key] = value.split('/')[-1] if '/' in value else value
                     else:
                         sanitized_data[key] = value
-                logger.debug(f"[POST DATA] {sanitized_data}")
+                logger.debug("[POST DATA] %s", sanitized_data)
         except Exception:
             pass
 
@@ -103,14 +160,20 @@ def log_request_info():
 @app.after_request
 def log_response_info(response):
     """Log response details and request duration."""
+    # Only set by log_request_info when DEBUG logging is enabled
+    if not hasattr(g, 'method'):
+        return response
+    
     # Calculate request duration
     duration = time.time() - g.start_time if hasattr(g, 'start_time') else 0
     
     # Log response
-    logger.info(
-        f"[RESPONSE] {request.method} {request.path} | "
-        f"Status: {response.status_code} | "
-        f"Duration: {duration:.3f}s"
+    logger.debug(
+        "[RESPONSE] %s %s | Status: %s | Duration: %.3fs",
+        g.method,
+        g.path,
+        response.status_code,
+        duration
     )
     
     return response
@@ -170,6 +233,33 @@ def deck_results(deck_id):
 # API Routes - Image Upload
 # ============================================================================
 
+def _upload_image_file(file) -> dict:
+    """
+    Stream one uploaded image to Azure Storage.
+    
+    Args:
+        file: Validated FileStorage from the request
+        
+    Returns:
+        Dictionary with the image URL and generated filenames
+    """
+    # Stream the upload straight to Azure (no local staging file)
+    unique_filename = generate_unique_filename(file.filename)
+    blob_name = f"{Config.AZURE_BLOB_PATH_INPUT}{unique_filename}"
+    # Werkzeug has already spooled the part, so its size is known up front
+    size = file.stream.seek(0, os.SEEK_END)
+    file.stream.seek(0)
+    blob_url = upload_stream_to_azure_blob(file.stream, blob_name, length=size)
+    
+    logger.info(f"[API] Image uploaded successfully: {unique_filename} -> {blob_url}")
+    
+    return {
+        'image_url': blob_url,
+        'filename': unique_filename,
+        'base_filename': unique_filename.rsplit('.', 1)[0]
+    }
+
+
 @app.route('/api/upload-image', methods=['POST'])
 def upload_image():
     """Handle image upload and upload to Azure Storage."""
@@ -183,34 +273,53 @@ def upload_image():
         if not is_valid:
             return jsonify({'error': error_msg}), 400
         
-        # Generate unique filename and save temporarily
-        unique_filename = generate_unique_filename(file.filename)
-        local_path = os.path.join(Config.UPLOAD_FOLDER, unique_filename)
-        file.save(local_path)
-        
-        try:
-            # Upload to Azure
-            blob_name = f"{Config.AZURE_BLOB_PATH_INPUT}{unique_filename}"
-            blob_url = upload_to_azure_blob(local_path, blob_name)
-            
-            logger.info(f"[API] Image uploaded successfully: {unique_filename} -> {blob_url}")
-            
-            return jsonify({
-                'success': True,
-                'image_url': blob_url,
-                'filename': unique_filename,
-                'base_filename': unique_filename.rsplit('.', 1)[0]
-            })
-        finally:
-            # Clean up local file
-            if os.path.exists(local_path):
-                os.remove(local_path)
+        return jsonify({'success': True, **_upload_image_file(file)})
     
     except Exception as e:
         logger.error(f"Error uploading image: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/upload-images', methods=['POST'])
+def upload_images():
+    """Upload several images to Azure Storage concurrently in one request."""
+    files = request.files.getlist('images')
+    logger.info(f"[API] Bulk image upload requested - {len(files)} file(s)")
+    try:
+        if not files:
+            return jsonify({'error': 'No image files provided'}), 400
+        
+        # Validate everything up front so nothing is uploaded for a bad batch
+        for file in files:
+            is_valid, error_msg = validate_image_file(file)
+            if not is_valid:
+                return jsonify({'error': f"{file.filename or 'file'}: {error_msg}"}), 400
+        
+        def upload_one(file):
+            try:
+                return {'success': True, 'original_filename': file.filename, **_upload_image_file(file)}
+            except Exception as e:
+                logger.error(f"Error uploading image {file.filename}: {e}", exc_info=True)
+                return {'success': False, 'original_filename': file.filename, 'error': str(e)}
+        
+        max_workers = min(len(files), Config.UPLOAD_MAX_WORKERS)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            images = list(executor.map(upload_one, files))
+        
+        uploaded = sum(1 for image in images if image['success'])
+        logger.info(f"[API] Bulk image upload finished - {uploaded}/{len(files)} succeeded")
+        
+        return jsonify({
+            'success': uploaded == len(files),
+            'images': images,
+            'count': uploaded
+        })
+    
+    except Exception as e:
+        logger.error(f"Error uploading images: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
 # ============================================================================
 # API Routes - Video Generation
 # ============================================================================
@@ -220,7 +329,7 @@ def generate_video():
     """Generate video using Veo API."""
     logger.info("[API] Video generation requested")
     try:
-        data = request.json
+        data = request.get_json(silent=True)
         
         # Validate required fields
         if not data or not data.get('image_url'):
@@ -254,15 +363,16 @@ def generate_video():
         if not image_filename and '/' in image_url:
             image_filename = image_url.split('/')[-1]
         
-        pending_tasks[task_id] = {
+        task_store.set(task_id, {
             'prompt': prompt,
             'image_url': image_url,
             'image_filename': image_filename,
             'aspect_ratio': aspect_ratio,
             'model': model,
             'generation_type': generation_type,
-            'created_at': __import__('datetime').datetime.now().isoformat()
-        }
+            'created_at': now_iso()
+        })
+        task_poller.track(task_id)
         
         logger.info(f"[API] Video generation started - Task ID: {task_id}, Model: {model}, Aspect: {aspect_ratio}")
         
@@ -279,76 +389,23 @@ def generate_video():
 
 @app.route('/api/video-status/<task_id>', methods=['GET'])
 def get_video_status(task_id):
-    """Get video generation status."""
-    logger.debug(f"[API] Checking video status for task: {task_id[:8]}...")
+    """Get video generation status (as last seen by the background poller)."""
+    logger.debug("[API] Checking video status for task: %s...", task_id[:8])
     try:
-        status_result = video_service.get_video_status(task_id)
-        status = status_result['status']
-        
-        logger.debug(f"[STATUS] Task {task_id[:8]}... status: {status}")
+        status_payload = task_store.get_status(task_id)
         
-        if status == 'completed':
-            response_data = status_result.get('response_data', {})
-            video_urls = response_data.get('resultUrls', [])
-            origin_urls = response_data.get('originUrls', [])
-            
-            # Get stored metadata
-            task_metadata = pending_tasks.pop(task_id, {})
-            
-            # Process completed video
-            if video_urls:
-                processed = video_service.process_completed_video(
-                    task_id,
-                    video_urls,
-                    task_metadata,
-                    Config.UPLOAD_FOLDER
-                )
-                final_video_urls = processed.get('azure_video_urls') or video_urls
-            else:
-                final_video_urls = []
-            
-            # Save to history
-            video_data = {
-                'task_id': task_id,
-                'video_urls': final_video_urls,
-                'origin_urls': origin_urls,
-                'veo_urls': video_urls,
-                'resolution': response_data.get('resolution', 'N/A'),
-                'prompt': task_metadata.get('prompt', ''),
-                'image_url': task_metadata.get('image_url', ''),
-                'aspect_ratio': task_metadata.get('aspect_ratio', ''),
-                'model': task_metadata.get('model', ''),
-                'generation_type': task_metadata.get('generation_type', ''),
-                'created_at': task_metadata.get('created_at', __import__('datetime').datetime.now().isoformat())
-            }
-            StorageService.add_to_history(video_data)
-            
-            logger.info(
-                f"[STATUS] Video generation completed - Task ID: {task_id[:8]}... | "
-                f"Resolution: {response_data.get('resolution', 'N/A')} | "
-                f"Videos: {len(final_video_urls)}"
-            )
-            
-            return jsonify({
-                'status': 'completed',
-                'task_id': task_id,
-                'video_urls': final_video_urls,
-                'origin_urls': origin_urls,
-                'resolution': response_data.get('resolution', 'N/A')
-            })
-        
-        elif status == 'processing':
+        if status_payload is None:
+            # Not polled yet (or tracked by a process that restarted)
+            if not task_store.is_active(task_id):
+                task_poller.track(task_id)
             return jsonify({
                 'status': 'processing',
                 'task_id': task_id
             })
         
-        else:  # failed
-            return jsonify({
-                'status': 'failed',
-                'task_id': task_id,
-                'error': status_result.get('error_message', 'Unknown error')
-            }), 400
+        if status_payload['status'] == 'failed':
+            return jsonify(status_payload), 400
+        return jsonify(status_payload)
     
     except Exception as e:
         logger.error(f"Error getting video status: {e}", exc_info=True)
@@ -356,6 +413,8 @@ def get_video_status(task_id):
 
 
 @app.route('/api/video-history', methods=['GET'])
+@conditional
+@cache.cached(key_prefix=VIDEO_HISTORY_CACHE_KEY, response_filter=is_success_response)
 def get_video_history():
     """Get all video generation history."""
     try:
@@ -375,12 +434,14 @@ def get_video_history():
 # ============================================================================
 
 @app.route('/api/decks', methods=['GET'])
+@conditional
+@cache.cached(key_prefix=DECKS_CACHE_KEY, response_filter=is_success_response)
 def get_decks():
     """Get all decks."""
     logger.debug("[API] Fetching all decks")
     try:
         decks = StorageService.load_decks()
-        logger.debug(f"[API] Retrieved {len(decks)} deck(s)")
+        logger.debug("[API] Retrieved %d deck(s)", len(decks))
         return jsonify({
             'success': True,
             'decks': decks,
@@ -396,8 +457,8 @@ def create_deck():
     """Create a new deck."""
     logger.info("[API] Creating new deck")
     try:
-        data = request.json or {}
-        deck_name = data.get('name', '').strip()
+        data = request.get_json(silent=True) or {}
+        deck_name = (data.get('name') or '').strip()
         aspect_ratio = data.get('aspect_ratio', Config.DEFAULT_ASPECT_RATIO)
         
         new_deck = deck_service.create_deck(deck_name, aspect_ratio)
@@ -436,7 +497,7 @@ def get_deck(deck_id):
 def update_deck(deck_id):
     """Update a deck."""
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         
         updated_deck = deck_service.update_deck(
             deck_id,
@@ -485,11 +546,18 @@ def delete_deck(deck_id):
 def add_card_to_deck(deck_id):
     """Add a card to a deck."""
     try:
-        data = request.json or {}
-        image_url = data.get('image_url', '').strip()
-        prompt = data.get('prompt', '').strip()
+        data = request.get_json(silent=True) or {}
+        image_url = (data.get('image_url') or '').strip()
+        prompt = (data.get('prompt') or '').strip()
         image_filename = data.get('image_filename', '')
         
+        # Reject bad input before touching storage
+        if not image_url:
+            return jsonify({'error': 'Image URL is required'}), 400
+        is_valid, error_msg = validate_prompt(prompt)
+        if not is_valid:
+            return jsonify({'error': error_msg}), 400
+        
         card = deck_service.add_card_to_deck(
             deck_id,
             image_url,
@@ -512,13 +580,23 @@ def add_card_to_deck(deck_id):
 def update_card(deck_id, card_id):
     """Update a card in a deck."""
     try:
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
+        image_url = data.get('image_url')
+        prompt = data.get('prompt')
+        
+        # Reject bad input before touching storage
+        if image_url is not None and not image_url.strip():
+            return jsonify({'error': 'Image URL is required'}), 400
+        if prompt is not None:
+            is_valid, error_msg = validate_prompt(prompt)
+            if not is_valid:
+                return jsonify({'error': error_msg}), 400
         
         card = deck_service.update_card(
             deck_id,
             card_id,
-            image_url=data.get('image_url'),
-            prompt=data.get('prompt'),
+            image_url=image_url,
+            prompt=prompt,
             image_filename=data.get('image_filename')
         )
         
@@ -552,15 +630,66 @@ def delete_card(deck_id, card_id):
         return jsonify({'error': str(e)}), 500
 
 
+def _generation_request_key(deck_id: str) -> Tuple[str, bool]:
+    """
+    Identify a deck generation request for deduplication.
+    
+    Uses the client's Idempotency-Key header if sent, otherwise the deck's
+    current scenes, so concurrent submissions of an unchanged deck are
+    duplicates.
+    
+    Args:
+        deck_id: Deck ID
+        
+    Returns:
+        (cache and lock key, whether the client sent an Idempotency-Key)
+    """
+    idempotency_key = request.headers.get('Idempotency-Key')
+    if idempotency_key:
+        material = idempotency_key.encode()
+    else:
+        deck = StorageService.get_deck_by_id(deck_id) or {}
+        material = orjson.dumps({
+            'aspect_ratio': deck.get('aspect_ratio'),
+            'cards': [[c.get('prompt'), c.get('image_url')] for c in deck.get('cards', [])]
+        })
+    key = f"{GENERATION_DEDUP_PREFIX}{deck_id}:{hashlib.sha256(material).hexdigest()}"
+    return key, bool(idempotency_key)
+
+
 @app.route('/api/decks/<deck_id>/generate', methods=['POST'])
 def generate_deck_videos(deck_id):
-    """Generate videos for all cards in a deck."""
+    """
+    Generate videos for all cards in a deck.
+    
+    Identical requests made while one is in progress don't start (and pay
+    for) new tasks. Requests repeating an Idempotency-Key within
+    GENERATION_DEDUP_TTL get the first request's response; without the
+    header, regenerating a finished deck starts new tasks.
+    """
     logger.info(f"[API] Starting video generation for deck: {deck_id[:8]}...")
+    request_key, explicit_key = _generation_request_key(deck_id)
+    
+    replay = cache.get(request_key) if explicit_key else None
+    if replay is not None:
+        logger.info(f"[API] Duplicate generation request for deck {deck_id[:8]}..., returning previous response")
+        return jsonify(replay)
+    
+    lock_token = task_store.acquire_lock(request_key, Config.GENERATION_DEDUP_TTL)
+    if not lock_token:
+        logger.info(f"[API] Generation for deck {deck_id[:8]}... already in progress")
+        return jsonify({
+            'success': True,
+            'message': 'Generation already in progress',
+            'duplicate': True,
+            'task_count': 0
+        })
+    
     try:
         result = deck_service.generate_deck_videos(deck_id)
         
         # Store pending tasks
-        pending_tasks.update(result['pending_tasks'])
+        task_store.update(result['pending_tasks'])
         
         deck = deck_service.get_deck(deck_id)
         
@@ -570,27 +699,33 @@ def generate_deck_videos(deck_id):
             f"Total Tasks: {result['task_count']}"
         )
         
-        return jsonify({
+        payload = {
             'success': True,
             'message': f'Started generation for {len(deck["cards"])} scenes ({Config.VIDEOS_PER_CARD} videos each)',
             'task_count': result['task_count'],
             'deck': deck
-        })
+        }
+        if explicit_key:
+            cache.set(request_key, payload, timeout=Config.GENERATION_DEDUP_TTL)
+        return jsonify(payload)
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error generating deck videos: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
+    finally:
+        # Later requests with the same key are answered from the cached response
+        task_store.release_lock(request_key, lock_token)
 
 
 @app.route('/api/decks/<deck_id>/check-status', methods=['POST'])
 def check_deck_status(deck_id):
     """Check and update status of all pending videos in a deck."""
-    logger.debug(f"[API] Checking status for deck: {deck_id[:8]}...")
+    logger.debug("[API] Checking status for deck: %s...", deck_id[:8])
     try:
         result = status_service.check_deck_status(
             deck_id,
-            pending_tasks,
+            task_store,
             Config.UPLOAD_FOLDER
         )
         
@@ -613,10 +748,63 @@ def check_deck_status(deck_id):
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/decks/<deck_id>/events', methods=['GET'])
+def deck_events(deck_id):
+    """
+    Stream deck updates as Server-Sent Events.
+    
+    Sends a 'deck-updated' event with the deck whenever it changes and ends
+    the stream once the deck is no longer generating. The deck poller saves
+    the progress, so any worker can serve the stream by watching the file.
+    """
+    if StorageService.get_deck_by_id(deck_id) is None:
+        return jsonify({'error': 'Deck not found'}), 404
+    
+    def stream():
+        last_version = None
+        last_payload = None
+        idle = 0.0
+        while True:
+            version = StorageService.decks_version()
+            if version != last_version or last_payload is None:
+                last_version = version
+                deck = StorageService.get_deck_by_id(deck_id)
+                if deck is None:
+                    yield "event: deck-deleted\ndata: {}\n\n"
+                    return
+                payload = orjson.dumps(deck)
+                if payload != last_payload:
+                    last_payload = payload
+                    idle = 0.0
+                    yield f"event: deck-updated\ndata: {payload.decode()}\n\n"
+                if deck.get('status') != 'generating':
+                    return
+            if idle >= DECK_EVENTS_HEARTBEAT:
+                # Comment line; lets the server notice disconnected clients
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            time.sleep(Config.STATUS_POLL_INTERVAL)
+            idle += Config.STATUS_POLL_INTERVAL
+    
+    logger.debug("[API] Streaming events for deck: %s...", deck_id[:8])
+    return Response(
+        stream(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @app.route('/api/decks/<deck_id>/videos', methods=['GET'])
 def get_deck_videos(deck_id):
     """Get all videos for a specific deck."""
     try:
+        # Serve the last body built for this version of decks.json
+        cache_key = f"{DECK_VIDEOS_CACHE_PREFIX}{deck_id}"
+        decks_version = StorageService.decks_version()
+        cached = cache.get(cache_key)
+        if cached is not None and cached[0] == decks_version:
+            return app.response_class(cached[1], mimetype='application/json')
+        
         deck = deck_service.get_deck(deck_id)
         if not deck:
             return jsonify({'error': 'Deck not found'}), 404
@@ -627,7 +815,7 @@ def get_deck_videos(deck_id):
         
         for card_index, card in enumerate(deck.get('cards', [])):
             # Add successful videos
-            approved_videos = card.get('approved_videos', [])
+            approved_videos = set(card.get('approved_videos', []))
             for video_url in card.get('video_urls', []):
                 all_videos.append({
                     'card_id': card['id'],
@@ -655,7 +843,7 @@ def get_deck_videos(deck_id):
                     'status': 'failed'
                 })
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'videos': all_videos,
             'failed': all_failed,
@@ -667,6 +855,8 @@ def get_deck_videos(deck_id):
                 'status': deck['status']
             }
         })
+        cache.set(cache_key, (decks_version, response.get_data()))
+        return response
     except Exception as e:
         logger.error(f"Error getting deck videos: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
@@ -677,52 +867,54 @@ def approve_video(deck_id):
     """Approve a video for a specific card in a deck."""
     logger.info(f"[API] Approving video for deck: {deck_id[:8]}...")
     try:
-        data = request.json or {}
-        video_url = data.get('video_url', '').strip()
-        card_id = data.get('card_id', '').strip()
+        data = request.get_json(silent=True) or {}
+        video_url = (data.get('video_url') or '').strip()
+        card_id = (data.get('card_id') or '').strip()
         
         if not video_url:
             return jsonify({'error': 'Video URL is required'}), 400
         if not card_id:
             return jsonify({'error': 'Card ID is required'}), 400
         
-        deck = deck_service.get_deck(deck_id)
-        if not deck:
-            return jsonify({'error': 'Deck not found'}), 404
-        
-        # Find the card
-        card = next((c for c in deck.get('cards', []) if c.get('id') == card_id), None)
-        if not card:
-            return jsonify({'error': 'Card not found'}), 404
-        
-        # Verify video URL exists in card
-        if video_url not in card.get('video_urls', []):
-            return jsonify({'error': 'Video not found in this card'}), 404
+        # Locate the card and approve the video in one locked update
+        outcome: Dict[str, Any] = {}
         
-        # Initialize approved_videos if it doesn't exist
-        if 'approved_videos' not in card:
-            card['approved_videos'] = []
-        
-        # Add to approved list if not already approved
-        if video_url not in card['approved_videos']:
-            card['approved_videos'].append(video_url)
+        def approve(deck: Dict[str, Any]) -> bool:
+            outcome['deck_found'] = True
+            cards = deck.get('cards', [])
+            card_index = StorageService.index_by_id(cards).get(card_id)
+            if card_index is None:
+                outcome['error'] = 'Card not found'
+                return False
+            card = cards[card_index]
             
-            # Update the deck
-            decks = StorageService.load_decks()
-            deck_index = next((i for i, d in enumerate(decks) if d.get('id') == deck_id), None)
+            # Verify video URL exists in card
+            if video_url not in card.get('video_urls', []):
+                outcome['error'] = 'Video not found in this card'
+                return False
             
-            if deck_index is not None:
-                card_index = next((i for i, c in enumerate(decks[deck_index]['cards']) if c.get('id') == card_id), None)
-                if card_index is not None:
-                    decks[deck_index]['cards'][card_index] = card
-                    decks[deck_index]['updated_at'] = __import__('datetime').datetime.now().isoformat()
-                    StorageService.save_decks(decks)
-                    
-                    logger.info(
-                        f"[API] Video approved - Deck: {deck_id[:8]}... | "
-                        f"Card: {card_id[:8]}... | "
-                        f"Video: {video_url.split('/')[-1]}"
-                    )
+            # Add to approved list if not already approved
+            approved_videos = card.setdefault('approved_videos', [])
+            if video_url in approved_videos:
+                return False
+            approved_videos.append(video_url)
+            deck['updated_at'] = now_iso()
+            return True
+        
+        approved = StorageService.mutate_deck(deck_id, approve)
+        if not outcome.get('deck_found'):
+            return jsonify({'error': 'Deck not found'}), 404
+        if 'error' in outcome:
+            return jsonify({'error': outcome['error']}), 404
+        if approved is None:
+            return jsonify({'error': 'Failed to save deck'}), 500
+        
+        if approved:
+            logger.info(
+                f"[API] Video approved - Deck: {deck_id[:8]}... | "
+                f"Card: {card_id[:8]}... | "
+                f"Video: {video_url.split('/')[-1]}"
+            )
         
         return jsonify({
             'success': True,
@@ -740,51 +932,51 @@ def unapprove_video(deck_id):
     """Unapprove a video for a specific card in a deck."""
     logger.info(f"[API] Unapproving video for deck: {deck_id[:8]}...")
     try:
-        data = request.json or {}
-        video_url = data.get('video_url', '').strip()
-        card_id = data.get('card_id', '').strip()
+        data = request.get_json(silent=True) or {}
+        video_url = (data.get('video_url') or '').strip()
+        card_id = (data.get('card_id') or '').strip()
         
         if not video_url:
             return jsonify({'error': 'Video URL is required'}), 400
         if not card_id:
             return jsonify({'error': 'Card ID is required'}), 400
         
-        deck = deck_service.get_deck(deck_id)
-        if not deck:
-            return jsonify({'error': 'Deck not found'}), 404
+        # Locate the card and unapprove the video in one locked update
+        outcome: Dict[str, Any] = {}
         
-        # Find the card
-        card = next((c for c in deck.get('cards', []) if c.get('id') == card_id), None)
-        if not card:
-            return jsonify({'error': 'Card not found'}), 404
+        def unapprove(deck: Dict[str, Any]) -> bool:
+            outcome['deck_found'] = True
+            cards = deck.get('cards', [])
+            card_index = StorageService.index_by_id(cards).get(card_id)
+            if card_index is None:
+                outcome['error'] = 'Card not found'
+                return False
+            
+            # Remove from approved list if it exists
+            approved_videos = cards[card_index].get('approved_videos', [])
+            if video_url not in approved_videos:
+                return False
+            approved_videos.remove(video_url)
+            deck['updated_at'] = now_iso()
+            return True
         
-        # Initialize approved_videos if it doesn't exist
-        if 'approved_videos' not in card:
-            card['approved_videos'] = []
+        unapproved = StorageService.mutate_deck(deck_id, unapprove)
+        if not outcome.get('deck_found'):
+            return jsonify({'error': 'Deck not found'}), 404
+        if 'error' in outcome:
+            return jsonify({'error': outcome['error']}), 404
+        if unapproved is None:
+            return jsonify({'error': 'Failed to save deck'}), 500
         
-        # Remove from approved list if it exists
-        if video_url in card['approved_videos']:
-            card['approved_videos'].remove(video_url)
-            
-            # Update the deck
-            decks = StorageService.load_decks()
-            deck_index = next((i for i, d in enumerate(decks) if d.get('id') == deck_id), None)
-            
-            if deck_index is not None:
-                card_index = next((i for i, c in enumerate(decks[deck_index]['cards']) if c.get('id') == card_id), None)
-                if card_index is not None:
-                    decks[deck_index]['cards'][card_index] = card
-                    decks[deck_index]['updated_at'] = __import__('datetime').datetime.now().isoformat()
-                    StorageService.save_decks(decks)
-                    
-                    logger.info(
-                        f"[API] Video unapproved - Deck: {deck_id[:8]}... | "
-                        f"Card: {card_id[:8]}... | "
-                        f"Video: {video_url.split('/')[-1]}"
-                    )
+        if unapproved:
+            logger.info(
+                f"[API] Video unapproved - Deck: {deck_id[:8]}... | "
+                f"Card: {card_id[:8]}... | "
+                f"Video: {video_url.split('/')[-1]}"
+            )
         else:
             # Video wasn't approved, but return success anyway
-            logger.debug(f"Video was not approved, nothing to unapprove: {video_url.split('/')[-1]}")
+            logger.debug("Video was not approved, nothing to unapprove: %s", video_url.rsplit('/', 1)[-1])
         
         return jsonify({
             'success': True,
@@ -797,94 +989,146 @@ def unapprove_video(deck_id):
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/decks/update-failed-tasks', methods=['POST'])
-def update_all_failed_tasks():
-    """Retroactively check and update failed tasks for all existing decks."""
-    global _failed_task_update_in_progress
-    
-    # Prevent multiple simultaneous updates
-    if _failed_task_update_in_progress:
-        logger.debug("Failed task update already in progress, skipping duplicate request")
-        return jsonify({
-            'success': True,
-            'message': 'Update already in progress',
-            'total_updated': 0,
-            'decks_checked': 0
-        })
+def _run_failed_task_update(lock_token: str) -> None:
+    """
+    Record failed tasks of all decks (runs on a background thread).
     
+    The caller must hold FAILED_TASK_UPDATE_LOCK with `lock_token`; it is
+    released here.
+    """
     try:
-        _failed_task_update_in_progress = True
         decks = StorageService.load_decks()
         total_updated = 0
         
         if decks:
-            logger.debug(f"Starting retroactive failed task update for {len(decks)} decks...")
+            logger.debug("Starting retroactive failed task update for %d decks...", len(decks))
         
+        # Collect every untracked task of incomplete cards up front
+        to_check = []
         for deck in decks:
-            deck_updated = False
             for card in deck.get('cards', []):
-                task_ids = card.get('task_ids', [])
-                video_urls = card.get('video_urls', [])
-                expected_count = len(task_ids)
-                actual_count = len(video_urls) if video_urls else 0
+                # Skip cards whose tasks all have a video or a tracked failure
+                if not StorageService.card_has_unaccounted_tasks(card):
+                    continue
                 
-                if expected_count > 0 and actual_count < expected_count:
-                    if 'failed_tasks' not in card:
-                        card['failed_tasks'] = []
-                    if 'failed_tasks_details' not in card:
-                        card['failed_tasks_details'] = []
+                tracked = {ft.get('task_id') for ft in card.get('failed_tasks_details', [])}
+                tracked.update(card.get('completed_tasks') or [])
+                for task_id in card['task_ids']:
+                    if task_id not in tracked:
+                        tracked.add(task_id)
+                        to_check.append((deck, card, task_id))
+        
+        # Query Veo concurrently, then apply the results serially
+        status_results = []
+        if to_check:
+            max_workers = min(len(to_check), Config.STATUS_CHECK_MAX_WORKERS)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                status_results = list(executor.map(
+                    video_service.try_get_video_status,
+                    [task_id for _, _, task_id in to_check]
+                ))
+        
+        # Failed (card ID, task ID, error) per deck ID
+        failures: Dict[str, List[Tuple[str, str, str]]] = {}
+        for (deck, card, task_id), status_result in zip(to_check, status_results):
+            if status_result is None or status_result['status'] != 'failed':
+                continue
+            error_msg = status_result.get('error_message', 'Unknown error')
+            failures.setdefault(deck['id'], []).append((card['id'], task_id, error_msg))
+        
+        def record_failures(deck_failures):
+            def apply(deck: Dict[str, Any]) -> int:
+                cards = deck.get('cards', [])
+                card_index = StorageService.index_by_id(cards)
+                recorded = 0
+                for card_id, task_id, error_msg in deck_failures:
+                    index = card_index.get(card_id)
+                    if index is None:
+                        continue
+                    card = cards[index]
+                    # The card may have been regenerated or updated meanwhile
+                    if task_id not in card.get('task_ids', []):
+                        continue
+                    failed_ids = card.setdefault('failed_tasks', [])
+                    failed_details = card.setdefault('failed_tasks_details', [])
+                    if any(ft.get('task_id') == task_id for ft in failed_details):
+                        continue
                     
-                    for task_id in task_ids:
-                        already_tracked = any(
-                            ft.get('task_id') == task_id
-                            for ft in card.get('failed_tasks_details', [])
-                        )
-                        if already_tracked:
-                            continue
-                        
-                        try:
-                            status_result = video_service.get_video_status(task_id)
-                            
-                            if status_result['status'] == 'failed':
-                                video_number = actual_count + len(card.get('failed_tasks_details', [])) + 1
-                                error_msg = status_result.get('error_message', 'Unknown error')
-                                
-                                card['failed_tasks'].append(task_id)
-                                card['failed_tasks_details'].append({
-                                    'task_id': task_id,
-                                    'error': error_msg,
-                                    'video_number': video_number
-                                })
-                                deck_updated = True
-                                total_updated += 1
-                                logger.info(
-                                    f"Tracked failed task {task_id[:8]}... for card {card['id'][:8]}... "
-                                    f"in deck {deck['name']}: {error_msg}"
-                                )
-                        except Exception as e:
-                            error_msg = str(e)
-                            if "record is null" not in error_msg.lower() and "not found" not in error_msg.lower():
-                                logger.warning(f"Could not check task {task_id[:8]}...: {e}")
-            
-            if deck_updated:
-                StorageService.update_deck(deck['id'], {'updated_at': __import__('datetime').datetime.now().isoformat()})
+                    video_number = len(card.get('video_urls') or []) + len(failed_details) + 1
+                    failed_ids.append(task_id)
+                    failed_details.append({
+                        'task_id': task_id,
+                        'error': error_msg,
+                        'video_number': video_number
+                    })
+                    recorded += 1
+                    logger.info(
+                        f"Tracked failed task {task_id[:8]}... for card {card_id[:8]}... "
+                        f"in deck {deck['name']}: {error_msg}"
+                    )
+                if recorded:
+                    deck['updated_at'] = now_iso()
+                return recorded
+            return apply
         
-        StorageService.save_decks(decks)
+        # Each deck is changed under the decks lock, and only if it has failures
+        for deck_id, deck_failures in failures.items():
+            total_updated += StorageService.mutate_deck(deck_id, record_failures(deck_failures)) or 0
         
         if total_updated > 0:
-            logger.info(f"Updated {total_updated} failed tasks across {len(decks)} decks")
-        
+            logger.info(f"Updated {total_updated} failed tasks across {len(failures)} decks")
+    except Exception as e:
+        logger.error(f"Error updating failed tasks: {e}", exc_info=True)
+    finally:
+        task_store.release_lock(FAILED_TASK_UPDATE_LOCK, lock_token)
+
+
+@app.route('/api/decks/update-failed-tasks', methods=['POST'])
+def update_all_failed_tasks():
+    """
+    Retroactively check and update failed tasks for all existing decks.
+    
+    The sweep runs in the background; the request returns 202 right away.
+    """
+    # Fast path: nothing to check (cached until decks.json changes)
+    if not StorageService.has_unsettled_cards():
         return jsonify({
             'success': True,
-            'message': f'Updated {total_updated} failed tasks across {len(decks)} decks',
-            'total_updated': total_updated,
-            'decks_checked': len(decks)
+            'message': 'No decks with missing videos',
+            'total_updated': 0,
+            'decks_checked': 0
         })
+    
+    # Prevent multiple simultaneous updates
+    lock_token = task_store.acquire_lock(FAILED_TASK_UPDATE_LOCK, FAILED_TASK_UPDATE_LOCK_TTL)
+    if not lock_token:
+        logger.debug("Failed task update already in progress, skipping duplicate request")
+        return jsonify({
+            'success': True,
+            'message': 'Update already in progress',
+            'total_updated': 0,
+            'decks_checked': 0
+        })
+    
+    try:
+        threading.Thread(
+            target=_run_failed_task_update,
+            args=(lock_token,),
+            name='failed-task-update',
+            daemon=True
+        ).start()
     except Exception as e:
-        logger.error(f"Error updating failed tasks: {e}", exc_info=True)
+        task_store.release_lock(FAILED_TASK_UPDATE_LOCK, lock_token)
+        logger.error(f"Error starting failed task update: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
-    finally:
-        _failed_task_update_in_progress = False
+    
+    return jsonify({
+        'success': True,
+        'message': 'Failed task update started',
+        'accepted': True,
+        'total_updated': 0,
+        'decks_checked': 0
+    }), 202
 
 
 # ============================================================================
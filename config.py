@@ -20,6 +20,7 @@ class Config:
     # File Paths
     HISTORY_FILE = 'video_history.json'
     DECKS_FILE = 'decks.json'
+    TASK_STORE_FILE = 'pending_tasks.json'  # In-process task store snapshot (unused with Redis)
     
     # Business Logic Configuration
     MAX_CARDS_PER_DECK = int(os.getenv('MAX_CARDS_PER_DECK', 50))
@@ -31,18 +32,37 @@ class Config:
     AZURE_CONTAINER_NAME = os.getenv('AZURE_CONTAINER_NAME', 'unai-public')
     AZURE_BLOB_PATH_INPUT = 'veo_video_generation/input_images/'
     AZURE_BLOB_PATH_OUTPUT = 'veo_video_generation/output_video/'
+    AZURE_MAX_SINGLE_PUT_SIZE = 4 * 1024 * 1024  # Larger uploads are split into blocks
+    AZURE_MAX_BLOCK_SIZE = 8 * 1024 * 1024
+    AZURE_CONNECTION_POOL_SIZE = int(os.getenv('AZURE_CONNECTION_POOL_SIZE', 64))
+    AZURE_CONNECTION_TIMEOUT = int(os.getenv('AZURE_CONNECTION_TIMEOUT', 60))  # seconds
+    AZURE_UPLOAD_CONCURRENCY = int(os.getenv('AZURE_UPLOAD_CONCURRENCY', 8))  # Parallel block uploads per blob
+    DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # Bytes read/written per chunk when downloading videos
+    DOWNLOAD_POOL_SIZE = int(os.getenv('DOWNLOAD_POOL_SIZE', 50))  # Keep-alive connections for video downloads
+    UPLOAD_MAX_WORKERS = int(os.getenv('UPLOAD_MAX_WORKERS', 16))  # Concurrent uploads per bulk request
     
     # Veo API Configuration
     VEO_API_KEY = os.getenv('VEO_API_KEY')
     VEO_API_BASE_URL = os.getenv('VEO_API_BASE_URL', 'https://api.kie.ai/api/v1/veo')
     
+    # Redis Configuration (optional - shares pending task state across workers)
+    REDIS_URL = os.getenv('REDIS_URL')
+    TASK_METADATA_TTL = int(os.getenv('TASK_METADATA_TTL', 86400))  # seconds
+    
+    # Response Cache Configuration (uses Redis when REDIS_URL is set)
+    API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', 30))  # seconds
+    
     # Rate Limiting Configuration
     RATE_LIMIT_BATCH_SIZE = int(os.getenv('RATE_LIMIT_BATCH_SIZE', 18))
     RATE_LIMIT_DELAY_SECONDS = float(os.getenv('RATE_LIMIT_DELAY_SECONDS', 10.5))
+    RATE_LIMIT_MAX_RETRIES = int(os.getenv('RATE_LIMIT_MAX_RETRIES', 5))  # Retries of a rate-limited request
+    GENERATION_DEDUP_TTL = int(os.getenv('GENERATION_DEDUP_TTL', 600))  # seconds a deck generation with a repeated Idempotency-Key is answered from cache
     
     # Polling Configuration
     STATUS_POLL_INTERVAL = int(os.getenv('STATUS_POLL_INTERVAL', 3))  # seconds
-    DECK_STATUS_POLL_INTERVAL = int(os.getenv('DECK_STATUS_POLL_INTERVAL', 30))  # seconds
+    DECK_STATUS_POLL_INTERVAL = int(os.getenv('DECK_STATUS_POLL_INTERVAL', 5))  # seconds between server-side deck checks
+    STATUS_CHECK_MAX_WORKERS = int(os.getenv('STATUS_CHECK_MAX_WORKERS', 32))  # Concurrent Veo status calls
+    FINALIZE_MAX_WORKERS = int(os.getenv('FINALIZE_MAX_WORKERS', 8))  # Completed videos mirrored to Azure at once
     
     # Video Generation Defaults
     DEFAULT_MODEL = os.getenv('DEFAULT_MODEL', 'veo3_fast')
@@ -51,7 +71,7 @@ class Config:
     VIDEOS_PER_CARD = int(os.getenv('VIDEOS_PER_CARD', 2))
     
     # Allowed File Extensions
-    ALLOWED_IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+    ALLOWED_IMAGE_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'webp'})
     
     @classmethod
     def validate(cls) -> None:
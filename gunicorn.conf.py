@@ -0,0 +1,35 @@
+"""
+Gunicorn configuration for Veo Video Generation application.
+
+Usage:
+    gunicorn app:app
+"""
+import os
+
+# Server socket
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Worker processes
+# Request handlers spend almost all of their time waiting on the Veo API and
+# Azure Storage, so each worker multiplexes many requests on gevent greenlets
+# instead of blocking one process per in-flight upload. Gunicorn monkey-patches
+# the worker before the app is imported, so requests (and the Azure SDK's
+# RequestsTransport) and the background threads become cooperative. Set
+# GUNICORN_WORKER_CLASS=gthread to fall back to a thread pool of
+# GUNICORN_THREADS. Without REDIS_URL, pending task metadata and locks live in
+# process memory, so only raise GUNICORN_WORKERS when Redis is set. Changes to
+# decks.json and video_history.json are serialized across workers with flock
+# on <file>.lock sidecars (POSIX only), so several workers are not supported
+# on Windows.
+workers = int(os.getenv('GUNICORN_WORKERS', 1))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+threads = int(os.getenv('GUNICORN_THREADS', 16))
+
+# Timeouts (uploads and deck generation can take a while)
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 300))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 30))
+
+# Logging is configured by the application (see utils/logging_config.py)
+accesslog = None
+errorlog = '-'
@@ -3,11 +3,22 @@ from .video_service import VideoService
 from .deck_service import DeckService
 from .storage_service import StorageService
 from .status_service import StatusService
+from .task_store import TaskStore, PersistentTaskStore, RedisTaskStore, create_task_store
+from .task_poller import TaskPoller
+from .deck_poller import DeckPoller
+from .history_writer import HistoryWriter
 
 __all__ = [
     'VideoService',
     'DeckService',
     'StorageService',
     'StatusService',
+    'TaskStore',
+    'PersistentTaskStore',
+    'RedisTaskStore',
+    'create_task_store',
+    'TaskPoller',
+    'DeckPoller',
+    'HistoryWriter',
 ]
 
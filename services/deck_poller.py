@@ -0,0 +1,99 @@
+"""Background status poller for decks that are generating videos."""
+import logging
+import threading
+from typing import Optional
+
+from config import Config
+from services.status_service import StatusService
+from services.storage_service import StorageService
+from services.task_store import TaskStore
+
+logger = logging.getLogger(__name__)
+
+
+class DeckPoller:
+    """
+    Check generating decks against the Veo API on a fixed cadence.
+    
+    Replaces browsers POSTing /check-status for every open deck: one worker
+    process runs the checks and saves the decks, and clients follow the
+    decks file through /api/decks/<deck_id>/events.
+    """
+    
+    LOCK_NAME = 'deck-poller'
+    
+    def __init__(
+        self,
+        status_service: StatusService,
+        task_store: TaskStore,
+        upload_folder: str = Config.UPLOAD_FOLDER,
+        interval: int = Config.DECK_STATUS_POLL_INTERVAL
+    ):
+        """
+        Initialize deck poller.
+        
+        Args:
+            status_service: Status service instance
+            task_store: Store holding task metadata
+            upload_folder: Folder for temporary file storage
+            interval: Seconds between polls
+        """
+        self.status_service = status_service
+        self.task_store = task_store
+        self.upload_folder = upload_folder
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        """Start the background polling thread (no-op if already running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='deck-poller', daemon=True)
+        self._thread.start()
+        logger.info(f"Deck poller started (interval: {self.interval}s)")
+    
+    def stop(self) -> None:
+        """Stop the background polling thread."""
+        self._stop_event.set()
+    
+    def _run(self) -> None:
+        """Polling loop."""
+        while not self._stop_event.wait(self.interval):
+            # Only one worker process polls per interval
+            if not self.task_store.acquire_lock(self.LOCK_NAME, self.interval):
+                continue
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.error(f"Error in deck poller: {e}", exc_info=True)
+    
+    def poll_once(self) -> None:
+        """Check every generating deck that still has unaccounted tasks."""
+        for deck in StorageService.load_decks():
+            if deck.get('status') != 'generating':
+                continue
+            # Cards get their task IDs only once generation requests are sent;
+            # checking before that would overwrite them with the stale deck
+            if not any(StorageService.card_has_unaccounted_tasks(card) for card in deck.get('cards', [])):
+                continue
+            try:
+                result = self.status_service.check_deck_status(
+                    deck['id'],
+                    self.task_store,
+                    self.upload_folder
+                )
+            except ValueError:
+                # Deleted since the decks were loaded
+                continue
+            except Exception as e:
+                logger.warning(f"Could not check deck {deck['id'][:8]}...: {e}")
+                continue
+            
+            if result['updated_videos'] > 0:
+                logger.info(
+                    f"[STATUS] Deck status updated - Deck: {deck['id'][:8]}... | "
+                    f"New Videos: {result['updated_videos']} | "
+                    f"Status: {result['deck'].get('status', 'unknown')}"
+                )
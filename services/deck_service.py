@@ -2,11 +2,11 @@
 import logging
 import uuid
 from typing import Dict, Any, Optional, List
-from datetime import datetime
 
 from config import Config
 from services.storage_service import StorageService
 from services.video_service import VideoService
+from utils.time_utils import now_iso
 from utils.validation import validate_deck_name, validate_prompt
 
 logger = logging.getLogger(__name__)
@@ -42,7 +42,7 @@ class DeckService:
         if not is_valid:
             raise ValueError(error)
         
-        decks = StorageService.load_decks()
+        now = now_iso()
         
         new_deck = {
             'id': str(uuid.uuid4()),
@@ -50,12 +50,11 @@ class DeckService:
             'aspect_ratio': aspect_ratio,
             'cards': [],
             'status': 'draft',  # draft, generating, completed
-            'created_at': datetime.now().isoformat(),
-            'updated_at': datetime.now().isoformat()
+            'created_at': now,
+            'updated_at': now
         }
         
-        decks.append(new_deck)
-        StorageService.save_decks(decks)
+        StorageService.add_deck(new_deck)
         
         logger.info(f"Created deck: {new_deck['id']} - {name}")
         return new_deck
@@ -146,20 +145,8 @@ class DeckService:
         if not is_valid:
             raise ValueError(error)
         
-        deck = self.get_deck(deck_id)
-        if not deck:
-            raise ValueError("Deck not found")
-        
-        # Check scene limit
-        if Config.MAX_CARDS_PER_DECK is not None:
-            current_card_count = len(deck.get('cards', []))
-            if current_card_count >= Config.MAX_CARDS_PER_DECK:
-                raise ValueError(
-                    f"Maximum {Config.MAX_CARDS_PER_DECK} scenes allowed per video. "
-                    f"Current: {current_card_count}"
-                )
-        
         # Create new card
+        now = now_iso()
         new_card = {
             'id': str(uuid.uuid4()),
             'image_url': image_url,
@@ -168,16 +155,24 @@ class DeckService:
             'status': 'pending',  # pending, generating, completed
             'task_ids': [],
             'video_urls': [],
-            'created_at': datetime.now().isoformat()
+            'created_at': now
         }
         
-        decks = StorageService.load_decks()
-        deck_index = next((i for i, d in enumerate(decks) if d['id'] == deck_id), None)
-        
-        if deck_index is not None:
-            decks[deck_index]['cards'].append(new_card)
-            decks[deck_index]['updated_at'] = datetime.now().isoformat()
-            StorageService.save_decks(decks)
+        def add(deck: Dict[str, Any]) -> Dict[str, Any]:
+            # Check scene limit
+            if Config.MAX_CARDS_PER_DECK is not None:
+                current_card_count = len(deck.get('cards', []))
+                if current_card_count >= Config.MAX_CARDS_PER_DECK:
+                    raise ValueError(
+                        f"Maximum {Config.MAX_CARDS_PER_DECK} scenes allowed per video. "
+                        f"Current: {current_card_count}"
+                    )
+            deck['cards'].append(new_card)
+            deck['updated_at'] = now
+            return new_card
+        
+        if StorageService.mutate_deck(deck_id, add) is None:
+            raise ValueError("Deck not found")
         
         logger.info(f"Added card {new_card['id']} to deck {deck_id}")
         return new_card
@@ -203,38 +198,35 @@ class DeckService:
         Returns:
             Updated card dictionary or None
         """
-        decks = StorageService.load_decks()
-        deck_index = next((i for i, d in enumerate(decks) if d['id'] == deck_id), None)
-        
-        if deck_index is None:
-            return None
-        
-        deck = decks[deck_index]
-        card = next((c for c in deck['cards'] if c['id'] == card_id), None)
-        
-        if not card:
-            return None
-        
-        # Validate and update
-        if image_url is not None:
-            if not image_url.strip():
-                raise ValueError("Image URL is required")
-            card['image_url'] = image_url
+        # Validate before touching the stored deck
+        if image_url is not None and not image_url.strip():
+            raise ValueError("Image URL is required")
         
         if prompt is not None:
             is_valid, error = validate_prompt(prompt)
             if not is_valid:
                 raise ValueError(error)
-            card['prompt'] = prompt
-        
-        if image_filename is not None:
-            card['image_filename'] = image_filename
-        
-        card['updated_at'] = datetime.now().isoformat()
-        decks[deck_index]['updated_at'] = datetime.now().isoformat()
-        StorageService.save_decks(decks)
         
-        logger.info(f"Updated card {card_id} in deck {deck_id}")
+        def update(deck: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            card = next((c for c in deck['cards'] if c['id'] == card_id), None)
+            if not card:
+                return None
+            
+            if image_url is not None:
+                card['image_url'] = image_url
+            if prompt is not None:
+                card['prompt'] = prompt
+            if image_filename is not None:
+                card['image_filename'] = image_filename
+            
+            now = now_iso()
+            card['updated_at'] = now
+            deck['updated_at'] = now
+            return card
+        
+        card = StorageService.mutate_deck(deck_id, update)
+        if card is not None:
+            logger.info(f"Updated card {card_id} in deck {deck_id}")
         return card
     
     def delete_card(self, deck_id: str, card_id: str) -> bool:
@@ -248,22 +240,17 @@ class DeckService:
         Returns:
             True if successful
         """
-        decks = StorageService.load_decks()
-        deck_index = next((i for i, d in enumerate(decks) if d['id'] == deck_id), None)
-        
-        if deck_index is None:
+        def delete(deck: Dict[str, Any]) -> bool:
+            original_count = len(deck['cards'])
+            deck['cards'] = [c for c in deck['cards'] if c['id'] != card_id]
+            if len(deck['cards']) < original_count:
+                deck['updated_at'] = now_iso()
+                return True
             return False
         
-        deck = decks[deck_index]
-        original_count = len(deck['cards'])
-        deck['cards'] = [c for c in deck['cards'] if c['id'] != card_id]
-        
-        if len(deck['cards']) < original_count:
-            deck['updated_at'] = datetime.now().isoformat()
-            StorageService.save_decks(decks)
+        if StorageService.mutate_deck(deck_id, delete):
             logger.info(f"Deleted card {card_id} from deck {deck_id}")
             return True
-        
         return False
     
     def generate_deck_videos(self, deck_id: str) -> Dict[str, Any]:
@@ -288,19 +275,20 @@ class DeckService:
         if deck['status'] == 'generating' and total_videos > 0:
             raise ValueError("Deck is already generating. Please wait for completion.")
         
-        # Update deck status
-        StorageService.update_deck(deck_id, {'status': 'generating'})
-        
-        # Reset card statuses and clear previous videos
-        decks = StorageService.load_decks()
-        deck_index = next((i for i, d in enumerate(decks) if d['id'] == deck_id), None)
+        # Mark the deck as generating and reset its cards in a single write
+        now = now_iso()
         
-        if deck_index is not None:
-            for card in decks[deck_index]['cards']:
+        def start(stored: Dict[str, Any]) -> Dict[str, Any]:
+            stored['status'] = 'generating'
+            stored['updated_at'] = now
+            for card in stored['cards']:
                 card['status'] = 'generating'
                 card['video_urls'] = []
                 card['task_ids'] = []
-            StorageService.save_decks(decks)
+                card['completed_tasks'] = []
+            return stored
+        
+        deck = StorageService.mutate_deck(deck_id, start) or deck
         
         # Generate videos
         result = self.video_service.generate_deck_videos(
@@ -311,12 +299,11 @@ class DeckService:
         
         # Store task metadata
         pending_tasks = {}
+        card_index = StorageService.index_by_id(deck['cards'])
         for task_info in result['task_ids']:
-            card = next(
-                (c for c in deck['cards'] if c['id'] == task_info['card_id']),
-                None
-            )
-            if card:
+            index = card_index.get(task_info['card_id'])
+            if index is not None:
+                card = deck['cards'][index]
                 pending_tasks[task_info['task_id']] = {
                     'deck_id': task_info['deck_id'],
                     'card_id': task_info['card_id'],
@@ -326,16 +313,15 @@ class DeckService:
                     'aspect_ratio': task_info['aspect_ratio'],
                     'model': Config.DEFAULT_MODEL,
                     'generation_type': Config.DEFAULT_GENERATION_TYPE,
-                    'created_at': datetime.now().isoformat()
+                    'created_at': now
                 }
         
         # Update cards with task_ids
-        decks = StorageService.load_decks()
-        deck_index = next((i for i, d in enumerate(decks) if d['id'] == deck_id), None)
+        def store_tasks(stored: Dict[str, Any]) -> bool:
+            stored['cards'] = result['cards']
+            return True
         
-        if deck_index is not None:
-            decks[deck_index]['cards'] = result['cards']
-            StorageService.save_decks(decks)
+        StorageService.mutate_deck(deck_id, store_tasks)
         
         logger.info(
             f"Started generation for deck {deck_id}: "
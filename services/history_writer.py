@@ -0,0 +1,140 @@
+"""Background writer for video history entries."""
+import atexit
+import logging
+import threading
+from collections import deque
+from typing import Callable, Deque, List, Dict, Any, Optional
+
+from utils.json_utils import CachedJSONFile
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryWriter:
+    """
+    Buffer history entries in memory and write them in batches.
+    
+    Completed videos are appended to an in-memory buffer and a background
+    thread merges the buffer into the history file once it holds
+    `batch_size` entries or `flush_interval` seconds have passed, so a burst
+    of completions costs one file rewrite instead of one per video. The
+    buffer never holds more than `max_entries` entries, since older ones
+    would be cut from the file anyway.
+    """
+    
+    def __init__(
+        self,
+        history_file: CachedJSONFile,
+        max_entries: int,
+        batch_size: int = 50,
+        flush_interval: float = 2.0,
+        on_flush: Optional[Callable[[], None]] = None
+    ):
+        """
+        Initialize history writer.
+        
+        Args:
+            history_file: History JSON file the entries are merged into
+            max_entries: Maximum number of entries kept in the file
+            batch_size: Number of buffered entries that triggers a flush
+            flush_interval: Maximum seconds an entry stays buffered
+            on_flush: Called after buffered entries are written (e.g. to
+                invalidate cached history views)
+        """
+        self.history_file = history_file
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        # Oldest first; appending to a full buffer drops the oldest entry
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=max_entries)
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def add(self, entry: Dict[str, Any]) -> bool:
+        """
+        Buffer a history entry for writing.
+        
+        Args:
+            entry: History entry dictionary
+        
+        Returns:
+            True once the entry is buffered
+        """
+        self._ensure_started()
+        with self._buffer_lock:
+            self._buffer.append(entry)
+            if len(self._buffer) >= self.batch_size:
+                self._wakeup.set()
+        return True
+    
+    def load(self) -> List[Dict[str, Any]]:
+        """
+        Get the history file's entries merged with the buffered ones.
+        
+        Entries stay buffered until their flush is saved, and both are read
+        under the buffer lock, so every entry is seen exactly once.
+        
+        Returns:
+            List of entries, most recent first
+        """
+        with self._buffer_lock:
+            history = self.history_file.load()
+            if self._buffer:
+                history = list(reversed(self._buffer)) + history[:self.max_entries - len(self._buffer)]
+            return history
+    
+    def __len__(self) -> int:
+        """Return the number of buffered entries."""
+        with self._buffer_lock:
+            return len(self._buffer)
+    
+    def flush(self) -> bool:
+        """
+        Write all buffered entries to the history file.
+        
+        Returns:
+            True if successful (or nothing to write)
+        """
+        with self._flush_lock:
+            # Readers keep seeing the batch in the buffer until it is saved;
+            # the file lock keeps other workers' flushes from being overwritten
+            with self._buffer_lock, self.history_file.locked():
+                batch_count = len(self._buffer)
+                if not batch_count:
+                    return True
+                
+                history = self.history_file.load()
+                # Most recent first; only the entries that survive the cap are copied
+                history = list(reversed(self._buffer)) + history[:self.max_entries - batch_count]
+                if not self.history_file.save(history):
+                    # Entries stay buffered so the next flush retries them
+                    return False
+                self._buffer.clear()
+            
+            if self.on_flush is not None:
+                self.on_flush()
+            logger.debug(f"Flushed {batch_count} history entries to {self.history_file.file_path}")
+            return True
+    
+    def _ensure_started(self) -> None:
+        """Start the background flush thread on first use."""
+        if self._thread is not None:
+            return
+        with self._flush_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+    
+    def _run(self) -> None:
+        """Flush loop."""
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing video history: {e}", exc_info=True)
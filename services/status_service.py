@@ -1,9 +1,11 @@
 """Status checking service for deck video generation."""
 import logging
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Set, Tuple
 
 from services.storage_service import StorageService
 from services.video_service import VideoService
+from services.task_store import TaskStore
 from utils.azure_utils import download_and_upload_video
 from utils.file_utils import get_base_filename
 from config import Config
@@ -26,7 +28,7 @@ class StatusService:
     def check_deck_status(
         self,
         deck_id: str,
-        pending_tasks: Dict[str, Dict[str, Any]],
+        pending_tasks: TaskStore,
         upload_folder: str
     ) -> Dict[str, Any]:
         """
@@ -34,7 +36,7 @@ class StatusService:
         
         Args:
             deck_id: Deck ID
-            pending_tasks: Dictionary of pending task metadata
+            pending_tasks: Store of pending task metadata
             upload_folder: Folder for temporary file storage
             
         Returns:
@@ -46,135 +48,252 @@ class StatusService:
         
         updated_count = 0
         
-        # Check status of all task IDs in all cards
+        # Only check cards with tasks that have neither a video nor a tracked
+        # failure, and skip the tasks already known to have completed or failed
+        checks = []
+        # Videos per card ID, counting the ones planned below
+        next_video_count: Dict[str, int] = {}
+        expected_video_count: Dict[str, int] = {}
         for card in deck.get('cards', []):
-            task_ids = card.get('task_ids', [])
-            existing_video_count = len(card.get('video_urls', []))
-            expected_video_count = len(task_ids)
-            
-            # Only check if we don't have all videos yet
-            if existing_video_count < expected_video_count:
-                for task_id in task_ids:
-                    try:
-                        status_result = self.video_service.get_video_status(task_id)
-                        
-                        if status_result['status'] == 'completed':
-                            self._process_completed_video(
-                                task_id,
-                                status_result,
-                                card,
-                                deck_id,
-                                pending_tasks,
-                                upload_folder
-                            )
-                            updated_count += 1
-                            
-                        elif status_result['status'] == 'failed':
-                            self._track_failed_video(
-                                task_id,
-                                status_result,
-                                card
-                            )
-                        
-                        # Remove from pending
-                        pending_tasks.pop(task_id, None)
-                        
-                    except Exception as e:
-                        error_msg = str(e)
-                        # Skip "record is null" errors (task still processing)
-                        if "record is null" not in error_msg.lower() and "not found" not in error_msg.lower():
-                            logger.error(f"Error checking task {task_id}: {e}")
+            if not StorageService.card_has_unaccounted_tasks(card):
+                continue
+            task_ids = card.get('task_ids') or []
+            known_done = set(card.get('completed_tasks') or []) | set(card.get('failed_tasks') or [])
+            next_video_count[card['id']] = len(card.get('video_urls') or [])
+            expected_video_count[card['id']] = len(task_ids)
+            checks.extend(
+                (card, task_id)
+                for task_id in task_ids
+                if task_id not in known_done
+            )
+        
+        # Status calls are independent HTTP requests; card updates stay serial
+        statuses = []
+        if checks:
+            max_workers = min(Config.STATUS_CHECK_MAX_WORKERS, len(checks))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                statuses = list(executor.map(
+                    self.video_service.try_get_video_status,
+                    (task_id for _, task_id in checks)
+                ))
+        
+        # Failed task IDs per card ID, filled as cards get failures
+        failed_seen: Dict[str, Set[str]] = {}
+        
+        # Plan transfers in task order so video numbers match the serial order
+        transfers = []
+        for (card, task_id), status_result in zip(checks, statuses):
+            if status_result is None:
+                continue
+            try:
+                if status_result['status'] == 'completed':
+                    video_count = next_video_count[card['id']]
+                    # Skip once the card would have all its videos
+                    if video_count < expected_video_count[card['id']]:
+                        planned = self._plan_completed_video(
+                            task_id,
+                            status_result,
+                            card,
+                            deck,
+                            pending_tasks,
+                            video_count + 1
+                        )
+                        if planned is not None:
+                            transfers.append((card, task_id, video_count + 1) + planned)
+                            next_video_count[card['id']] = video_count + 1
+                    updated_count += 1
+                    
+                elif status_result['status'] == 'failed':
+                    self._track_failed_video(
+                        task_id,
+                        status_result,
+                        card,
+                        failed_seen
+                    )
+                
+                # Remove from pending
+                pending_tasks.pop(task_id, None)
+                
+            except Exception as e:
+                logger.error(f"Error processing task {task_id}: {e}")
+        
+        # Move the videos to Azure concurrently, then record them serially
+        azure_video_urls: List[Optional[str]] = []
+        if transfers:
+            max_workers = min(Config.FINALIZE_MAX_WORKERS, len(transfers))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                azure_video_urls = list(executor.map(
+                    lambda transfer: download_and_upload_video(transfer[3], transfer[4], upload_folder),
+                    transfers
+                ))
+            for (card, task_id, video_number, _, _), azure_video_url in zip(transfers, azure_video_urls):
+                self._record_transferred_video(task_id, card, video_number, azure_video_url, failed_seen)
+        
+        # Results per checked card, applied to the deck as stored at save time
+        new_videos: Dict[str, List[Tuple[str, str]]] = {}
+        for (card, task_id, _, _, _), azure_video_url in zip(transfers, azure_video_urls):
+            if azure_video_url:
+                new_videos.setdefault(card['id'], []).append((task_id, azure_video_url))
+        checked_tasks: Dict[str, Set[str]] = {}
+        for card, task_id in checks:
+            checked_tasks.setdefault(card['id'], set()).add(task_id)
+        checked_cards = {card['id']: card for card, _ in checks}
         
-        # Update card and deck statuses
-        self._update_card_statuses(deck)
-        self._update_deck_status(deck)
+        # The checks above took seconds; edits saved meanwhile must survive,
+        # so only the deltas are applied to the deck loaded under the lock
+        stored_decks: List[Dict[str, Any]] = []
         
-        # Save the updated deck - need to update the entire deck in the list
-        decks = StorageService.load_decks()
-        deck_index = next((i for i, d in enumerate(decks) if d.get('id') == deck_id), None)
-        if deck_index is not None:
-            decks[deck_index] = deck
-            StorageService.save_decks(decks)
+        def apply_results(stored: Dict[str, Any]) -> bool:
+            stored_decks.append(stored)
+            statuses_before = self._statuses_of(stored)
+            changed = self._apply_checked_results(stored, checked_cards, checked_tasks, new_videos)
+            self._update_statuses(stored)
+            # Unchanged decks aren't rewritten, so deck event streams stay quiet
+            return changed or self._statuses_of(stored) != statuses_before
+        
+        StorageService.mutate_deck(deck_id, apply_results)
+        if not stored_decks:
+            raise ValueError("Deck not found")
+        stored_deck = stored_decks[0]
         
         return {
             'updated_videos': updated_count,
-            'deck': deck
+            'deck': stored_deck
         }
     
-    def _process_completed_video(
+    @staticmethod
+    def _statuses_of(deck: Dict[str, Any]) -> Tuple[Any, List[Any]]:
+        """Get the deck status and every card status of a deck."""
+        return deck.get('status'), [card.get('status') for card in deck.get('cards', [])]
+    
+    @staticmethod
+    def _apply_checked_results(
+        deck: Dict[str, Any],
+        checked_cards: Dict[str, Dict[str, Any]],
+        checked_tasks: Dict[str, Set[str]],
+        new_videos: Dict[str, List[Tuple[str, str]]]
+    ) -> bool:
+        """
+        Copy the videos and failures found for the checked tasks to a deck.
+        
+        Only cards that still exist and tasks they still own are touched,
+        so a card regenerated or deleted during the check is left alone.
+        Tasks whose video is stored are listed in the card's
+        `completed_tasks`, so later checks don't fetch them again.
+        
+        Args:
+            deck: Deck as currently stored
+            checked_cards: Checked cards with their results, by card ID
+            checked_tasks: Checked task IDs by card ID
+            new_videos: (task ID, Azure video URL) pairs added by the check, by card ID
+            
+        Returns:
+            True if the deck was changed
+        """
+        changed = False
+        for card in deck.get('cards', []):
+            checked = checked_cards.get(card.get('id'))
+            if checked is None:
+                continue
+            owned_tasks = checked_tasks[card['id']] & set(card.get('task_ids') or [])
+            if not owned_tasks:
+                continue
+            
+            video_urls = card.setdefault('video_urls', [])
+            completed_ids = card.setdefault('completed_tasks', [])
+            expected_video_count = len(card.get('task_ids') or [])
+            for task_id, video_url in new_videos.get(card['id'], []):
+                # Another check may have stored this card's videos meanwhile
+                if task_id not in owned_tasks or task_id in completed_ids:
+                    continue
+                completed_ids.append(task_id)
+                if video_url not in video_urls and len(video_urls) < expected_video_count:
+                    video_urls.append(video_url)
+                changed = True
+            
+            failed_ids = card.setdefault('failed_tasks', [])
+            failed_details = card.setdefault('failed_tasks_details', [])
+            tracked = {ft.get('task_id') for ft in failed_details}
+            for detail in checked.get('failed_tasks_details') or []:
+                task_id = detail.get('task_id')
+                if task_id in owned_tasks and task_id not in tracked:
+                    tracked.add(task_id)
+                    if task_id not in failed_ids:
+                        failed_ids.append(task_id)
+                    failed_details.append(detail)
+                    changed = True
+        return changed
+    
+    def _plan_completed_video(
         self,
         task_id: str,
         status_result: Dict[str, Any],
         card: Dict[str, Any],
-        deck_id: str,
-        pending_tasks: Dict[str, Dict[str, Any]],
-        upload_folder: str
-    ) -> None:
-        """Process a completed video."""
+        deck: Dict[str, Any],
+        pending_tasks: TaskStore,
+        video_number: int
+    ) -> Optional[Tuple[str, str]]:
+        """Get the (Veo URL, blob base filename) of a completed video, or None if it has none."""
         response_data = status_result.get('response_data', {})
         video_urls = response_data.get('resultUrls', [])
         
         if not video_urls:
-            return
+            return None
         
         # Get task metadata
         task_metadata = pending_tasks.get(task_id, {})
         if not task_metadata:
-            deck = StorageService.get_deck_by_id(deck_id)
+            # The deck being checked has everything the metadata would hold
             task_metadata = {
                 'image_filename': card.get('image_filename', ''),
-                'deck_id': deck_id,
+                'deck_id': deck.get('id'),
                 'card_id': card['id'],
                 'prompt': card.get('prompt', ''),
                 'image_url': card.get('image_url', ''),
-                'aspect_ratio': deck.get('aspect_ratio', Config.DEFAULT_ASPECT_RATIO) if deck else Config.DEFAULT_ASPECT_RATIO,
+                'aspect_ratio': deck.get('aspect_ratio', Config.DEFAULT_ASPECT_RATIO),
             }
         
-        # Check if we need to process this video
-        current_video_count = len(card.get('video_urls', []))
-        expected_video_count = len(card.get('task_ids', []))
-        
-        if current_video_count >= expected_video_count:
-            return  # Already have all videos
-        
         # Determine filename
         image_filename = task_metadata.get('image_filename', '')
         if image_filename:
             base_filename = get_base_filename(image_filename)
-            video_number = current_video_count + 1
             base_filename = f"{base_filename}_{video_number}"
         else:
             base_filename = task_id
         
         logger.info(
             f"Processing task {task_id[:8]}... for card {card['id'][:8]}...: "
-            f"video {video_number}/{expected_video_count}"
-        )
-        
-        # Download and upload to Azure
-        azure_video_url = download_and_upload_video(
-            video_urls[0],
-            base_filename,
-            upload_folder
+            f"video {video_number}/{len(card.get('task_ids', []))}"
         )
+        return video_urls[0], base_filename
+    
+    def _record_transferred_video(
+        self,
+        task_id: str,
+        card: Dict[str, Any],
+        video_number: int,
+        azure_video_url: Optional[str],
+        failed_seen: Dict[str, Set[str]]
+    ) -> None:
+        """Add a video moved to Azure to its card, or track the failed transfer."""
+        expected_video_count = len(card.get('task_ids', []))
         
         if azure_video_url:
-            if 'video_urls' not in card:
-                card['video_urls'] = []
+            video_urls = card.setdefault('video_urls', [])
             
             # Check if URL already exists
-            if azure_video_url not in card['video_urls']:
-                card['video_urls'].append(azure_video_url)
+            if azure_video_url not in video_urls:
+                video_urls.append(azure_video_url)
                 logger.info(
                     f"Added video to card {card['id'][:8]}... "
-                    f"Total: {len(card['video_urls'])}/{expected_video_count}"
+                    f"Total: {len(video_urls)}/{expected_video_count}"
                 )
             else:
                 logger.debug("Video already exists in card, skipping duplicate")
         else:
             # Track as failed
             error_msg = "Failed to download or upload video to Azure"
-            self._add_failed_task(card, task_id, error_msg, video_number)
+            self._add_failed_task(card, task_id, error_msg, video_number, failed_seen)
             logger.warning(
                 f"Failed to process video for task {task_id[:8]}... ({error_msg})"
             )
@@ -183,7 +302,8 @@ class StatusService:
         self,
         task_id: str,
         status_result: Dict[str, Any],
-        card: Dict[str, Any]
+        card: Dict[str, Any],
+        failed_seen: Dict[str, Set[str]]
     ) -> None:
         """Track a failed video generation."""
         error_code = status_result.get('error_code', '')
@@ -203,76 +323,82 @@ class StatusService:
         video_number = current_video_count + 1
         
         logger.warning(f"Task {task_id[:8]}... failed on KIE API side: {error_msg}")
-        self._add_failed_task(card, task_id, error_msg, video_number)
+        self._add_failed_task(card, task_id, error_msg, video_number, failed_seen)
     
     def _add_failed_task(
         self,
         card: Dict[str, Any],
         task_id: str,
         error_msg: str,
-        video_number: int
+        video_number: int,
+        failed_seen: Dict[str, Set[str]]
     ) -> None:
-        """Add a failed task to card tracking."""
-        if 'failed_tasks' not in card:
-            card['failed_tasks'] = []
-        if 'failed_tasks_details' not in card:
-            card['failed_tasks_details'] = []
+        """
+        Add a failed task to card tracking.
+        
+        `failed_seen` maps card IDs to their tracked failed task IDs; a
+        card's set is built on its first failure and kept up to date here.
+        """
+        failed_ids = card.setdefault('failed_tasks', [])
+        failed_details = card.setdefault('failed_tasks_details', [])
         
         # Check if already tracked
-        task_exists = any(
-            ft.get('task_id') == task_id
-            for ft in card.get('failed_tasks_details', [])
-        )
+        tracked = failed_seen.get(card['id'])
+        if tracked is None:
+            tracked = failed_seen[card['id']] = {
+                ft.get('task_id') for ft in failed_details
+            }
         
-        if not task_exists:
-            card['failed_tasks'].append(task_id)
-            card['failed_tasks_details'].append({
+        if task_id not in tracked:
+            tracked.add(task_id)
+            failed_ids.append(task_id)
+            failed_details.append({
                 'task_id': task_id,
                 'error': error_msg,
                 'video_number': video_number
             })
     
-    def _update_card_statuses(self, deck: Dict[str, Any]) -> None:
-        """Update status for all cards in a deck."""
+    def _update_statuses(self, deck: Dict[str, Any]) -> None:
+        """
+        Update the status of every card and of the deck in one pass.
+        
+        The deck is settled once every card with tasks is completed,
+        partially completed or failed; it is completed if any of those
+        cards has a video and failed otherwise.
+        """
+        cards_with_tasks = 0
+        settled_cards = 0
+        cards_with_videos = 0
+        
         for card in deck['cards']:
             expected_videos = len(card.get('task_ids', []))
+            if expected_videos == 0:
+                continue
             actual_videos = len(card.get('video_urls', []))
             failed_count = len(card.get('failed_tasks', []))
             
-            if expected_videos > 0:
-                if actual_videos >= expected_videos:
-                    card['status'] = 'completed'
-                elif actual_videos > 0:
-                    if actual_videos + failed_count >= expected_videos:
-                        card['status'] = 'partially_completed'
-                    else:
-                        card['status'] = 'generating'
-                elif failed_count > 0 and actual_videos == 0:
-                    card['status'] = 'failed'
+            if actual_videos >= expected_videos:
+                card['status'] = 'completed'
+            elif actual_videos > 0:
+                if actual_videos + failed_count >= expected_videos:
+                    card['status'] = 'partially_completed'
                 else:
                     card['status'] = 'generating'
-    
-    def _update_deck_status(self, deck: Dict[str, Any]) -> None:
-        """Update deck status based on card statuses."""
-        cards_with_tasks = [
-            c for c in deck['cards']
-            if len(c.get('task_ids', [])) > 0
-        ]
+            elif failed_count > 0:
+                card['status'] = 'failed'
+            else:
+                card['status'] = 'generating'
+            
+            cards_with_tasks += 1
+            if card['status'] != 'generating':
+                settled_cards += 1
+            if actual_videos > 0:
+                cards_with_videos += 1
         
         if not cards_with_tasks:
             return
         
-        all_completed = all(
-            c.get('status') in ['completed', 'partially_completed', 'failed']
-            for c in cards_with_tasks
-        )
-        
-        if all_completed:
-            has_any_videos = any(
-                len(c.get('video_urls', [])) > 0
-                for c in cards_with_tasks
-            )
-            deck['status'] = 'completed' if has_any_videos else 'failed'
+        if settled_cards == cards_with_tasks:
+            deck['status'] = 'completed' if cards_with_videos else 'failed'
         else:
             deck['status'] = 'generating'
-
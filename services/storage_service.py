@@ -1,13 +1,41 @@
 """Storage service for managing video history and decks."""
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import Callable, List, Dict, Any, Optional, Tuple, TypeVar
+
+import orjson
 
 from config import Config
-from utils.json_utils import load_json_file, save_json_file, append_to_json_list
+from services.history_writer import HistoryWriter
+from utils.cache import invalidate, VIDEO_HISTORY_CACHE_KEY, DECKS_CACHE_KEY
+from utils.json_utils import CachedJSONFile
+from utils.time_utils import now_iso
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
+# History is re-read from disk only when the file changes
+_history_file = CachedJSONFile(Config.HISTORY_FILE, default=[])
+
+# Completed videos are buffered and written to the history file in batches
+_history_writer = HistoryWriter(
+    _history_file,
+    Config.MAX_HISTORY_ENTRIES,
+    on_flush=lambda: invalidate(VIDEO_HISTORY_CACHE_KEY)
+)
+
+# Decks are re-read from disk only when the file changes
+_decks_file = CachedJSONFile(Config.DECKS_FILE, default=[])
+
+# (decks file version, serialized deck per deck ID) for single-deck reads
+_deck_lookup_cache: Optional[Tuple[Optional[Tuple[int, int]], Dict[str, bytes]]] = None
+
+# (decks file version, list position per deck ID) for locating decks to update
+_deck_index_cache: Optional[Tuple[Optional[Tuple[int, int]], Dict[str, int]]] = None
+
+# (decks file version, whether any card has unaccounted tasks)
+_unsettled_cache: Optional[Tuple[Optional[Tuple[int, int]], bool]] = None
+
 
 class StorageService:
     """Service for managing persistent storage."""
@@ -17,10 +45,14 @@ class StorageService:
         """
         Load video generation history from JSON file.
         
+        Includes entries that are still buffered and not yet written. The
+        file contents are cached in memory and reread only after the file
+        changes.
+        
         Returns:
             List of video history entries
         """
-        return load_json_file(Config.HISTORY_FILE, default=[])
+        return _history_writer.load()
     
     @staticmethod
     def save_video_history(history: List[Dict[str, Any]]) -> bool:
@@ -33,40 +65,63 @@ class StorageService:
         Returns:
             True if successful
         """
-        return save_json_file(Config.HISTORY_FILE, history)
+        saved = _history_file.save(history)
+        invalidate(VIDEO_HISTORY_CACHE_KEY)
+        return saved
     
     @staticmethod
     def add_to_history(video_data: Dict[str, Any]) -> bool:
         """
         Add a completed video to history.
         
+        The entry is buffered and written by a background thread.
+        
         Args:
             video_data: Video data dictionary
             
         Returns:
-            True if successful
+            True if the entry was accepted
         """
         # Add timestamp if not present
         if 'created_at' not in video_data:
-            video_data['created_at'] = datetime.now().isoformat()
-        
-        history = StorageService.load_video_history()
-        history.insert(0, video_data)  # Add to beginning (most recent first)
+            video_data['created_at'] = now_iso()
         
-        # Keep only last N entries
-        history = history[:Config.MAX_HISTORY_ENTRIES]
+        added = _history_writer.add(video_data)
+        invalidate(VIDEO_HISTORY_CACHE_KEY)
+        return added
+    
+    @staticmethod
+    def flush_video_history() -> bool:
+        """
+        Write buffered history entries to the JSON file immediately.
         
-        return StorageService.save_video_history(history)
+        Returns:
+            True if successful
+        """
+        return _history_writer.flush()
     
     @staticmethod
     def load_decks() -> List[Dict[str, Any]]:
         """
         Load decks from JSON file.
         
+        The file contents are cached in memory and reread only after the
+        file changes. Each call returns a fresh copy that may be mutated.
+        
         Returns:
             List of deck dictionaries
         """
-        return load_json_file(Config.DECKS_FILE, default=[])
+        return _decks_file.load()
+    
+    @staticmethod
+    def decks_version() -> Optional[Tuple[int, int]]:
+        """
+        Get a token that changes whenever the decks file changes.
+        
+        Returns:
+            (mtime_ns, size) tuple, or None if no decks file exists
+        """
+        return _decks_file.version()
     
     @staticmethod
     def save_decks(decks: List[Dict[str, Any]]) -> bool:
@@ -79,21 +134,174 @@ class StorageService:
         Returns:
             True if successful
         """
-        return save_json_file(Config.DECKS_FILE, decks)
+        saved = _decks_file.save(decks)
+        invalidate(DECKS_CACHE_KEY)
+        return saved
+    
+    @staticmethod
+    def card_has_unaccounted_tasks(card: Dict[str, Any]) -> bool:
+        """
+        Check whether some of a card's tasks have neither a video nor a
+        tracked failure.
+        
+        Tasks listed in `completed_tasks` or `failed_tasks_details` are
+        accounted for; the counts also settle cards saved before completed
+        tasks were recorded.
+        
+        Args:
+            card: Card dictionary
+            
+        Returns:
+            True if the card may have untracked failed tasks
+        """
+        task_ids = card.get('task_ids') or []
+        video_count = len(card.get('video_urls') or [])
+        failed_details = card.get('failed_tasks_details') or []
+        if video_count >= len(task_ids) or video_count + len(failed_details) >= len(task_ids):
+            return False
+        accounted = set(card.get('completed_tasks') or [])
+        accounted.update(ft.get('task_id') for ft in failed_details)
+        return any(task_id not in accounted for task_id in task_ids)
+    
+    @staticmethod
+    def has_unsettled_cards() -> bool:
+        """
+        Check whether any deck has a card with unaccounted tasks.
+        
+        The result is cached until the decks file changes.
+        
+        Returns:
+            True if update_all_failed_tasks has anything to check
+        """
+        global _unsettled_cache
+        
+        version = StorageService.decks_version()
+        cached = _unsettled_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        unsettled = any(
+            StorageService.card_has_unaccounted_tasks(card)
+            for deck in StorageService.load_decks()
+            for card in deck.get('cards', [])
+        )
+        _unsettled_cache = (version, unsettled)
+        return unsettled
+    
+    @staticmethod
+    def index_by_id(items: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Map item IDs to their positions in a list of decks or cards.
+        
+        Args:
+            items: List of dictionaries with an 'id' key
+            
+        Returns:
+            Dictionary of ID to list index
+        """
+        return {item.get('id'): i for i, item in enumerate(items)}
+    
+    @staticmethod
+    def find_deck_index(decks: List[Dict[str, Any]], deck_id: str) -> Optional[int]:
+        """
+        Find the position of a deck in a list returned by load_decks().
+        
+        Positions are cached until the decks file changes, so repeated
+        lookups don't scan the list. A cached position is only trusted if
+        the deck at that position has the requested ID.
+        
+        Args:
+            decks: List of deck dictionaries
+            deck_id: Deck ID
+            
+        Returns:
+            List index of the deck or None if not found
+        """
+        global _deck_index_cache
+        
+        version = StorageService.decks_version()
+        cached = _deck_index_cache
+        if cached is None or cached[0] != version:
+            cached = (version, StorageService.index_by_id(decks))
+            _deck_index_cache = cached
+        
+        index = cached[1].get(deck_id)
+        if index is not None and index < len(decks) and decks[index].get('id') == deck_id:
+            return index
+        # The list was loaded from a different version of the file
+        return next((i for i, d in enumerate(decks) if d.get('id') == deck_id), None)
     
     @staticmethod
     def get_deck_by_id(deck_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a deck by its ID.
         
+        Uses a per-deck lookup rebuilt only when the decks file changes, so
+        only the requested deck is parsed. The result may be mutated.
+        
         Args:
             deck_id: Deck ID
             
         Returns:
             Deck dictionary or None if not found
         """
-        decks = StorageService.load_decks()
-        return next((d for d in decks if d.get('id') == deck_id), None)
+        global _deck_lookup_cache
+        
+        version = StorageService.decks_version()
+        cached = _deck_lookup_cache
+        if cached is None or cached[0] != version:
+            lookup = {d.get('id'): orjson.dumps(d) for d in StorageService.load_decks()}
+            cached = (version, lookup)
+            _deck_lookup_cache = cached
+        
+        raw = cached[1].get(deck_id)
+        return orjson.loads(raw) if raw is not None else None
+    
+    @staticmethod
+    def add_deck(deck: Dict[str, Any]) -> bool:
+        """
+        Append a new deck to the decks file.
+        
+        Args:
+            deck: Deck dictionary
+            
+        Returns:
+            True if successful
+        """
+        with _decks_file.locked():
+            decks = StorageService.load_decks()
+            decks.append(deck)
+            return StorageService.save_decks(decks)
+    
+    @staticmethod
+    def mutate_deck(deck_id: str, mutate: Callable[[Dict[str, Any]], T]) -> Optional[T]:
+        """
+        Change a deck with a single load and save of the decks file.
+        
+        `mutate` is called with the stored deck and changes it in place; the
+        decks are saved only if it returns a truthy value. Concurrent
+        mutations, across threads and worker processes, are serialized so
+        none is lost.
+        
+        Args:
+            deck_id: Deck ID
+            mutate: Function applied to the deck
+            
+        Returns:
+            Result of mutate, or None if the deck was not found or the
+            change could not be saved
+        """
+        with _decks_file.locked():
+            decks = StorageService.load_decks()
+            deck_index = StorageService.find_deck_index(decks, deck_id)
+            
+            if deck_index is None:
+                return None
+            
+            result = mutate(decks[deck_index])
+            if result and not StorageService.save_decks(decks):
+                return None
+            return result
     
     @staticmethod
     def update_deck(deck_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -107,21 +315,12 @@ class StorageService:
         Returns:
             Updated deck dictionary or None if not found
         """
-        decks = StorageService.load_decks()
-        deck_index = next((i for i, d in enumerate(decks) if d.get('id') == deck_id), None)
-        
-        if deck_index is None:
-            return None
+        def apply(deck: Dict[str, Any]) -> Dict[str, Any]:
+            deck.update(updates)
+            deck['updated_at'] = now_iso()
+            return deck
         
-        # Apply updates
-        for key, value in updates.items():
-            decks[deck_index][key] = value
-        
-        decks[deck_index]['updated_at'] = datetime.now().isoformat()
-        
-        if StorageService.save_decks(decks):
-            return decks[deck_index]
-        return None
+        return StorageService.mutate_deck(deck_id, apply)
     
     @staticmethod
     def delete_deck(deck_id: str) -> bool:
@@ -134,11 +333,12 @@ class StorageService:
         Returns:
             True if successful
         """
-        decks = StorageService.load_decks()
-        original_count = len(decks)
-        decks = [d for d in decks if d.get('id') != deck_id]
-        
-        if len(decks) < original_count:
-            return StorageService.save_decks(decks)
-        return False
+        with _decks_file.locked():
+            decks = StorageService.load_decks()
+            original_count = len(decks)
+            decks = [d for d in decks if d.get('id') != deck_id]
+            
+            if len(decks) < original_count:
+                return StorageService.save_decks(decks)
+            return False
 
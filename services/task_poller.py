@@ -0,0 +1,214 @@
+"""Background status poller for single video generation tasks."""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+from config import Config
+from services.storage_service import StorageService
+from services.task_store import TaskStore
+from services.video_service import VideoService
+from utils.time_utils import now_iso
+
+logger = logging.getLogger(__name__)
+
+
+class TaskPoller:
+    """
+    Poll the Veo API for active tasks on a fixed cadence.
+    
+    Clients polling /api/video-status only read the status stored by this
+    poller, so the number of Veo API calls depends on the number of active
+    tasks rather than on how often browsers poll. Completed videos are
+    mirrored to Azure on a worker pool so a slow transfer doesn't hold up
+    polling of the other tasks; meanwhile their status is 'finalizing'.
+    """
+    
+    LOCK_NAME = 'task-poller'
+    
+    def __init__(
+        self,
+        video_service: VideoService,
+        task_store: TaskStore,
+        upload_folder: str = Config.UPLOAD_FOLDER,
+        interval: int = Config.STATUS_POLL_INTERVAL,
+        finalize_workers: int = Config.FINALIZE_MAX_WORKERS
+    ):
+        """
+        Initialize task poller.
+        
+        Args:
+            video_service: Video service instance
+            task_store: Store holding task metadata and statuses
+            upload_folder: Folder for temporary file storage
+            interval: Seconds between polls
+            finalize_workers: Completed tasks finalized concurrently
+        """
+        self.video_service = video_service
+        self.task_store = task_store
+        self.upload_folder = upload_folder
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._finalize_pool = ThreadPoolExecutor(
+            max_workers=finalize_workers,
+            thread_name_prefix='task-finalize'
+        )
+    
+    def start(self) -> None:
+        """Start the background polling thread (no-op if already running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='task-poller', daemon=True)
+        self._thread.start()
+        logger.info(f"Task poller started (interval: {self.interval}s)")
+    
+    def stop(self) -> None:
+        """Stop the background polling thread."""
+        self._stop_event.set()
+    
+    def track(self, task_id: str) -> None:
+        """
+        Start tracking a task.
+        
+        Args:
+            task_id: Veo task ID
+        """
+        self.task_store.add_active(task_id)
+    
+    def _run(self) -> None:
+        """Polling loop."""
+        while not self._stop_event.wait(self.interval):
+            # Only one worker process polls per interval
+            if not self.task_store.acquire_lock(self.LOCK_NAME, self.interval):
+                continue
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.error(f"Error in task poller: {e}", exc_info=True)
+    
+    def poll_once(self) -> None:
+        """Poll Veo once for every active task and store the results."""
+        task_ids = self.task_store.active_tasks()
+        if not task_ids:
+            return
+        
+        # Status calls are independent; the results are applied serially
+        max_workers = min(Config.STATUS_CHECK_MAX_WORKERS, len(task_ids))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            status_results = list(executor.map(self.video_service.try_get_video_status, task_ids))
+        
+        for task_id, status_result in zip(task_ids, status_results):
+            if status_result is None:
+                continue
+            
+            status = status_result['status']
+            logger.debug("[STATUS] Task %s... status: %s", task_id[:8], status)
+            
+            if status == 'completed':
+                # Guard against another worker finalizing the same task
+                if not self.task_store.acquire_lock(f"finalize:{task_id}", Config.TASK_METADATA_TTL):
+                    continue
+                # Stored before submitting so it can't overwrite the final status
+                self.task_store.set_status(
+                    task_id,
+                    {'status': 'finalizing', 'task_id': task_id},
+                    Config.TASK_METADATA_TTL
+                )
+                self.task_store.remove_active(task_id)
+                self._finalize_pool.submit(self._finalize_safely, task_id, status_result)
+                continue
+            
+            if status == 'processing':
+                payload = {'status': 'processing', 'task_id': task_id}
+            else:
+                self.task_store.pop(task_id)
+                payload = {
+                    'status': 'failed',
+                    'task_id': task_id,
+                    'error': status_result.get('error_message', 'Unknown error')
+                }
+            
+            self.task_store.set_status(task_id, payload, Config.TASK_METADATA_TTL)
+            if status != 'processing':
+                self.task_store.remove_active(task_id)
+    
+    def _finalize_safely(self, task_id: str, status_result: Dict[str, Any]) -> None:
+        """
+        Finalize a completed task on the worker pool and store its status.
+        
+        Args:
+            task_id: Veo task ID
+            status_result: Result of VideoService.get_video_status
+        """
+        try:
+            payload = self._finalize_completed(task_id, status_result)
+        except Exception as e:
+            logger.error(f"Error finalizing task {task_id[:8]}...: {e}", exc_info=True)
+            payload = {
+                'status': 'failed',
+                'task_id': task_id,
+                'error': f"Failed to save completed video: {e}"
+            }
+        self.task_store.set_status(task_id, payload, Config.TASK_METADATA_TTL)
+    
+    def _finalize_completed(self, task_id: str, status_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Mirror a completed video to Azure and record it in history.
+        
+        Args:
+            task_id: Veo task ID
+            status_result: Result of VideoService.get_video_status
+        
+        Returns:
+            Completed status payload
+        """
+        response_data = status_result.get('response_data', {})
+        video_urls = response_data.get('resultUrls', [])
+        origin_urls = response_data.get('originUrls', [])
+        
+        # Get stored metadata
+        task_metadata = self.task_store.pop(task_id)
+        
+        # Process completed video
+        if video_urls:
+            processed = self.video_service.process_completed_video(
+                task_id,
+                video_urls,
+                task_metadata,
+                self.upload_folder
+            )
+            final_video_urls = processed.get('azure_video_urls') or video_urls
+        else:
+            final_video_urls = []
+        
+        # Save to history
+        video_data = {
+            'task_id': task_id,
+            'video_urls': final_video_urls,
+            'origin_urls': origin_urls,
+            'veo_urls': video_urls,
+            'resolution': response_data.get('resolution', 'N/A'),
+            'prompt': task_metadata.get('prompt', ''),
+            'image_url': task_metadata.get('image_url', ''),
+            'aspect_ratio': task_metadata.get('aspect_ratio', ''),
+            'model': task_metadata.get('model', ''),
+            'generation_type': task_metadata.get('generation_type', ''),
+            'created_at': task_metadata.get('created_at') or now_iso()
+        }
+        StorageService.add_to_history(video_data)
+        
+        logger.info(
+            f"[STATUS] Video generation completed - Task ID: {task_id[:8]}... | "
+            f"Resolution: {response_data.get('resolution', 'N/A')} | "
+            f"Videos: {len(final_video_urls)}"
+        )
+        
+        return {
+            'status': 'completed',
+            'task_id': task_id,
+            'video_urls': final_video_urls,
+            'origin_urls': origin_urls,
+            'resolution': response_data.get('resolution', 'N/A')
+        }
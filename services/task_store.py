@@ -0,0 +1,477 @@
+"""Pending task metadata store."""
+import atexit
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+import orjson
+import redis
+
+from config import Config
+from utils.json_utils import load_json_file, save_json_file
+
+logger = logging.getLogger(__name__)
+
+
+class TaskStore:
+    """
+    Store for metadata of in-flight Veo generation tasks.
+    
+    Veo runs generation jobs remotely and returns a task ID immediately, so
+    the web process only needs to remember the request metadata (prompt,
+    image, deck/card IDs) until the task is finalized. All access goes
+    through this class so the backing store can be swapped without touching
+    the routes or services.
+    
+    This implementation keeps everything in process memory and is only
+    correct with a single worker process; see RedisTaskStore. Metadata
+    expires after `ttl` seconds like in Redis, so tasks that are never
+    finalized do not accumulate.
+    """
+    
+    def __init__(self, ttl: int = Config.TASK_METADATA_TTL):
+        """
+        Initialize an empty in-process task store.
+        
+        Args:
+            ttl: Seconds to keep task metadata before it expires
+        """
+        self.ttl = ttl
+        # Insertion (and therefore expiry) ordered: task_id -> (expires_at, metadata)
+        self._tasks: Dict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
+        self._active: Set[str] = set()
+        self._statuses: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._next_status_sweep = 0.0
+        # name -> (expires_at, holder token)
+        self._locks: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+    
+    def set(self, task_id: str, metadata: Dict[str, Any]) -> None:
+        """
+        Store metadata for a task.
+        
+        Args:
+            task_id: Veo task ID
+            metadata: Task metadata dictionary
+        """
+        with self._lock:
+            self._store(task_id, metadata)
+    
+    def _store(self, task_id: str, metadata: Dict[str, Any]) -> None:
+        """Insert metadata and evict expired entries (caller holds the lock)."""
+        now = time.monotonic()
+        self._tasks.pop(task_id, None)
+        self._tasks[task_id] = (now + self.ttl, dict(metadata))
+        # Every entry has the same TTL, so the oldest ones expire first
+        while self._tasks:
+            oldest_id, (expires_at, _) = next(iter(self._tasks.items()))
+            if expires_at > now:
+                break
+            del self._tasks[oldest_id]
+    
+    def _lookup(self, task_id: str, remove: bool) -> Optional[Dict[str, Any]]:
+        """Get unexpired metadata, optionally removing it (caller holds the lock)."""
+        entry = self._tasks.pop(task_id, None) if remove else self._tasks.get(task_id)
+        if entry is None:
+            return None
+        expires_at, metadata = entry
+        if expires_at <= time.monotonic():
+            self._tasks.pop(task_id, None)
+            return None
+        return metadata
+    
+    def update(self, tasks: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Store metadata for several tasks at once.
+        
+        Args:
+            tasks: Mapping of task ID to metadata dictionary
+        """
+        with self._lock:
+            for task_id, metadata in tasks.items():
+                self._store(task_id, metadata)
+    
+    def get(self, task_id: str, default: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Get metadata for a task.
+        
+        Args:
+            task_id: Veo task ID
+            default: Value returned if the task is unknown (defaults to empty dict)
+        
+        Returns:
+            Task metadata dictionary
+        """
+        with self._lock:
+            metadata = self._lookup(task_id, remove=False)
+        if metadata is None:
+            return default if default is not None else {}
+        return dict(metadata)
+    
+    def pop(self, task_id: str, default: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Remove a task and return its metadata.
+        
+        Args:
+            task_id: Veo task ID
+            default: Value returned if the task is unknown (defaults to empty dict)
+        
+        Returns:
+            Task metadata dictionary
+        """
+        with self._lock:
+            metadata = self._lookup(task_id, remove=True)
+        if metadata is None:
+            return default if default is not None else {}
+        return metadata
+    
+    def add_active(self, task_id: str) -> None:
+        """
+        Mark a task as active so the background poller tracks it.
+        
+        Args:
+            task_id: Veo task ID
+        """
+        with self._lock:
+            self._active.add(task_id)
+    
+    def remove_active(self, task_id: str) -> None:
+        """
+        Stop tracking a task in the background poller.
+        
+        Args:
+            task_id: Veo task ID
+        """
+        with self._lock:
+            self._active.discard(task_id)
+    
+    def is_active(self, task_id: str) -> bool:
+        """
+        Check whether a task is tracked by the background poller.
+        
+        Args:
+            task_id: Veo task ID
+        
+        Returns:
+            True if the task is active
+        """
+        with self._lock:
+            return task_id in self._active
+    
+    def active_tasks(self) -> List[str]:
+        """
+        Get all tasks tracked by the background poller.
+        
+        Returns:
+            List of task IDs
+        """
+        with self._lock:
+            return list(self._active)
+    
+    def set_status(self, task_id: str, status: Dict[str, Any], ttl: int) -> None:
+        """
+        Store the latest status payload for a task.
+        
+        Args:
+            task_id: Veo task ID
+            status: Status payload as returned by the status endpoint
+            ttl: Seconds to keep the status
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._statuses[task_id] = (now + ttl, dict(status))
+            # Statuses of tasks nobody polls again are only removed here;
+            # sweeping at most once per TTL keeps stores cheap
+            if now >= self._next_status_sweep:
+                self._statuses = {
+                    tid: entry for tid, entry in self._statuses.items() if entry[0] > now
+                }
+                self._next_status_sweep = now + ttl
+    
+    def get_status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest status payload for a task.
+        
+        Args:
+            task_id: Veo task ID
+        
+        Returns:
+            Status payload, or None if no unexpired status is stored
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._statuses.get(task_id)
+            if entry is None:
+                return None
+            expires_at, status = entry
+            if expires_at <= now:
+                del self._statuses[task_id]
+                return None
+            return dict(status)
+    
+    def acquire_lock(self, name: str, ttl: int) -> Optional[str]:
+        """
+        Try to acquire a named lock without blocking.
+        
+        Args:
+            name: Lock name
+            ttl: Seconds after which the lock expires if never released
+        
+        Returns:
+            Token identifying this holder, or None if the lock is taken
+        """
+        now = time.monotonic()
+        with self._lock:
+            held = self._locks.get(name)
+            if held is not None and held[0] > now:
+                return None
+            token = uuid.uuid4().hex
+            self._locks[name] = (now + ttl, token)
+            return token
+    
+    def release_lock(self, name: str, token: str) -> None:
+        """
+        Release a named lock if it is still held with `token`.
+        
+        A holder that ran past the TTL must not release a lock someone
+        else has acquired since.
+        
+        Args:
+            name: Lock name
+            token: Token returned by acquire_lock
+        """
+        with self._lock:
+            held = self._locks.get(name)
+            if held is not None and held[1] == token:
+                del self._locks[name]
+    
+    def __len__(self) -> int:
+        """Return the number of pending tasks."""
+        now = time.monotonic()
+        with self._lock:
+            return sum(1 for expires_at, _ in self._tasks.values() if expires_at > now)
+
+
+class PersistentTaskStore(TaskStore):
+    """
+    In-process task store whose metadata survives restarts.
+    
+    Task metadata is snapshotted to a JSON file by a background thread;
+    changes within `flush_interval` seconds are coalesced into one write.
+    Expiry times are stored as wall-clock timestamps, so entries that
+    expired while the app was down are dropped on load. Statuses and locks
+    are short-lived and stay in memory only.
+    """
+    
+    def __init__(
+        self,
+        file_path: str,
+        ttl: int = Config.TASK_METADATA_TTL,
+        flush_interval: float = 1.0
+    ):
+        """
+        Initialize persistent task store, loading any saved metadata.
+        
+        Args:
+            file_path: Path to the JSON snapshot file
+            ttl: Seconds to keep task metadata before it expires
+            flush_interval: Seconds to wait for more changes before writing
+        """
+        super().__init__(ttl)
+        self.file_path = file_path
+        self.flush_interval = flush_interval
+        self._dirty = threading.Event()
+        self._load()
+        threading.Thread(target=self._run, name='task-store-writer', daemon=True).start()
+        atexit.register(self.flush)
+    
+    def _load(self) -> None:
+        """Restore unexpired metadata from the snapshot file."""
+        data = load_json_file(self.file_path, default={})
+        if not isinstance(data, dict):
+            return
+        
+        now_wall, now_mono = time.time(), time.monotonic()
+        entries = sorted(
+            (entry['expires_at'], task_id, entry['metadata'])
+            for task_id, entry in data.items()
+            if isinstance(entry, dict) and entry.get('expires_at', 0) > now_wall
+        )
+        # Oldest first, matching the expiry order _store relies on
+        for expires_at, task_id, metadata in entries:
+            self._tasks[task_id] = (now_mono + expires_at - now_wall, metadata)
+        if entries:
+            logger.info(f"Restored {len(entries)} pending task(s) from {self.file_path}")
+    
+    def flush(self) -> bool:
+        """
+        Write unexpired task metadata to the snapshot file now.
+        
+        Returns:
+            True if successful
+        """
+        self._dirty.clear()
+        now_wall, now_mono = time.time(), time.monotonic()
+        with self._lock:
+            snapshot = {
+                task_id: {'expires_at': now_wall + expires_at - now_mono, 'metadata': metadata}
+                for task_id, (expires_at, metadata) in self._tasks.items()
+                if expires_at > now_mono
+            }
+        return save_json_file(self.file_path, snapshot, indent=None)
+    
+    def _run(self) -> None:
+        """Flush loop."""
+        while True:
+            self._dirty.wait()
+            # Let further changes accumulate into the same write
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error saving task store: {e}", exc_info=True)
+    
+    def set(self, task_id: str, metadata: Dict[str, Any]) -> None:
+        """Store metadata for a task."""
+        super().set(task_id, metadata)
+        self._dirty.set()
+    
+    def update(self, tasks: Dict[str, Dict[str, Any]]) -> None:
+        """Store metadata for several tasks at once."""
+        super().update(tasks)
+        self._dirty.set()
+    
+    def pop(self, task_id: str, default: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Remove a task and return its metadata."""
+        with self._lock:
+            removed = self._lookup(task_id, remove=True)
+        # Finished tasks are popped on every poll; only real removals need a snapshot
+        if removed is None:
+            return default if default is not None else {}
+        self._dirty.set()
+        return removed
+
+
+class RedisTaskStore(TaskStore):
+    """
+    Task store backed by Redis.
+    
+    Task metadata and locks are shared by every worker process, so the app
+    can run under multiple gunicorn workers and keeps pending tasks across
+    restarts.
+    """
+    
+    KEY_PREFIX = 'task:'
+    STATUS_PREFIX = 'status:'
+    LOCK_PREFIX = 'lock:'
+    ACTIVE_KEY = 'active_tasks'
+    
+    # Deletes the lock only if it still holds the releasing holder's token
+    RELEASE_LOCK_SCRIPT = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) end "
+        "return 0"
+    )
+    
+    def __init__(self, redis_url: str, ttl: int = Config.TASK_METADATA_TTL):
+        """
+        Initialize Redis task store.
+        
+        Args:
+            redis_url: Redis connection URL
+            ttl: Seconds to keep task metadata before it expires
+        """
+        self.redis = redis.Redis.from_url(redis_url, decode_responses=True)
+        self.ttl = ttl
+        self._release_lock_script = self.redis.register_script(self.RELEASE_LOCK_SCRIPT)
+    
+    def _key(self, task_id: str) -> str:
+        return f"{self.KEY_PREFIX}{task_id}"
+    
+    def set(self, task_id: str, metadata: Dict[str, Any]) -> None:
+        """Store metadata for a task."""
+        self.redis.set(self._key(task_id), orjson.dumps(metadata), ex=self.ttl)
+    
+    def update(self, tasks: Dict[str, Dict[str, Any]]) -> None:
+        """Store metadata for several tasks in one round trip."""
+        if not tasks:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for task_id, metadata in tasks.items():
+            pipe.set(self._key(task_id), orjson.dumps(metadata), ex=self.ttl)
+        pipe.execute()
+    
+    def get(self, task_id: str, default: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Get metadata for a task."""
+        raw = self.redis.get(self._key(task_id))
+        if raw is None:
+            return default if default is not None else {}
+        return orjson.loads(raw)
+    
+    def pop(self, task_id: str, default: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Remove a task and return its metadata."""
+        pipe = self.redis.pipeline()
+        pipe.get(self._key(task_id))
+        pipe.delete(self._key(task_id))
+        raw, _ = pipe.execute()
+        if raw is None:
+            return default if default is not None else {}
+        return orjson.loads(raw)
+    
+    def add_active(self, task_id: str) -> None:
+        """Mark a task as active so the background poller tracks it."""
+        self.redis.sadd(self.ACTIVE_KEY, task_id)
+    
+    def remove_active(self, task_id: str) -> None:
+        """Stop tracking a task in the background poller."""
+        self.redis.srem(self.ACTIVE_KEY, task_id)
+    
+    def is_active(self, task_id: str) -> bool:
+        """Check whether a task is tracked by the background poller."""
+        return bool(self.redis.sismember(self.ACTIVE_KEY, task_id))
+    
+    def active_tasks(self) -> List[str]:
+        """Get all tasks tracked by the background poller."""
+        return list(self.redis.smembers(self.ACTIVE_KEY))
+    
+    def set_status(self, task_id: str, status: Dict[str, Any], ttl: int) -> None:
+        """Store the latest status payload for a task."""
+        self.redis.set(f"{self.STATUS_PREFIX}{task_id}", orjson.dumps(status), ex=ttl)
+    
+    def get_status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get the latest status payload for a task."""
+        raw = self.redis.get(f"{self.STATUS_PREFIX}{task_id}")
+        return orjson.loads(raw) if raw is not None else None
+    
+    def acquire_lock(self, name: str, ttl: int) -> Optional[str]:
+        """Try to acquire a named lock shared by all workers."""
+        token = uuid.uuid4().hex
+        if self.redis.set(f"{self.LOCK_PREFIX}{name}", token, nx=True, ex=ttl):
+            return token
+        return None
+    
+    def release_lock(self, name: str, token: str) -> None:
+        """Release a named lock if it is still held with `token`."""
+        self._release_lock_script(keys=[f"{self.LOCK_PREFIX}{name}"], args=[token])
+    
+    def __len__(self) -> int:
+        """Return the number of pending tasks."""
+        return sum(1 for _ in self.redis.scan_iter(match=f"{self.KEY_PREFIX}*"))
+
+
+def create_task_store() -> TaskStore:
+    """
+    Create the task store configured for this deployment.
+    
+    Returns:
+        RedisTaskStore if REDIS_URL is set, otherwise an in-process
+        PersistentTaskStore
+    """
+    if Config.REDIS_URL:
+        logger.info("Using Redis task store")
+        return RedisTaskStore(Config.REDIS_URL)
+    logger.info("Using in-process task store (set REDIS_URL to share tasks across workers)")
+    return PersistentTaskStore(Config.TASK_STORE_FILE)
@@ -1,6 +1,8 @@
 """Video generation service."""
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
@@ -9,6 +11,7 @@ from config import Config
 from services.storage_service import StorageService
 from utils.azure_utils import download_and_upload_video
 from utils.file_utils import get_base_filename
+from utils.rate_limiter import RateLimiter, call_with_backoff
 
 logger = logging.getLogger(__name__)
 
@@ -27,12 +30,24 @@ class VideoService:
         if not self.api_key:
             raise ValueError("VEO_API_KEY is required")
         self._generator: Optional[VeoVideoGenerator] = None
+        self._generator_lock = threading.Lock()
+        # Shared by every generation request made through this service
+        self._rate_limiter = RateLimiter(
+            Config.RATE_LIMIT_BATCH_SIZE,
+            Config.RATE_LIMIT_DELAY_SECONDS
+        )
     
     @property
     def generator(self) -> VeoVideoGenerator:
         """Get or create Veo generator instance (singleton pattern)."""
         if self._generator is None:
-            self._generator = VeoVideoGenerator(self.api_key)
+            # Status checks run on thread pools; they must share one session
+            with self._generator_lock:
+                if self._generator is None:
+                    self._generator = VeoVideoGenerator(
+                        self.api_key,
+                        pool_size=Config.STATUS_CHECK_MAX_WORKERS
+                    )
         return self._generator
     
     def generate_video(
@@ -64,6 +79,7 @@ class VideoService:
             Exception: If generation fails
         """
         try:
+            self._rate_limiter.acquire()
             result = self.generator.generate_video(
                 prompt=prompt,
                 image_urls=[image_url],
@@ -98,34 +114,59 @@ class VideoService:
             Dictionary with status information
         """
         try:
-            details = self.generator.get_video_details(task_id)
-            success_flag = details.get('successFlag')
-            response_data = details.get('response', {})
-            
-            if success_flag == 1:
-                return {
-                    'status': 'completed',
-                    'response_data': response_data,
-                    'details': details
-                }
-            elif success_flag == 0:
-                return {
-                    'status': 'processing',
-                    'details': details
-                }
-            else:
-                error_code = details.get('errorCode')
-                error_message = details.get('errorMessage', 'Unknown error')
-                return {
-                    'status': 'failed',
-                    'error_code': error_code,
-                    'error_message': error_message,
-                    'details': details
-                }
+            return self._status_from_details(self.generator.get_video_details(task_id))
         except Exception as e:
             logger.error(f"Error getting video status for {task_id}: {e}", exc_info=True)
             raise
     
+    def try_get_video_status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get video generation status for background checks, without raising.
+        
+        Tasks Veo doesn't report yet ("record is null", "not found") are
+        skipped quietly; other errors are logged.
+        
+        Args:
+            task_id: Task ID to check
+            
+        Returns:
+            Dictionary with status information, or None if it could not be fetched
+        """
+        try:
+            return self._status_from_details(self.generator.get_video_details(task_id))
+        except Exception as e:
+            error_msg = str(e).lower()
+            if "record is null" not in error_msg and "not found" not in error_msg:
+                logger.warning(f"Could not check task {task_id[:8]}...: {e}")
+            return None
+    
+    @staticmethod
+    def _status_from_details(details: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert Veo task details to a status dictionary."""
+        success_flag = details.get('successFlag')
+        response_data = details.get('response', {})
+        
+        if success_flag == 1:
+            return {
+                'status': 'completed',
+                'response_data': response_data,
+                'details': details
+            }
+        elif success_flag == 0:
+            return {
+                'status': 'processing',
+                'details': details
+            }
+        else:
+            error_code = details.get('errorCode')
+            error_message = details.get('errorMessage', 'Unknown error')
+            return {
+                'status': 'failed',
+                'error_code': error_code,
+                'error_message': error_message,
+                'details': details
+            }
+    
     def process_completed_video(
         self,
         task_id: str,
@@ -192,6 +233,50 @@ class VideoService:
                 'base_filename': base_filename
             }
     
+    @staticmethod
+    def _is_rate_limit_error(error: Exception) -> bool:
+        """Check whether a Veo API error means the request was rate limited."""
+        response = getattr(error, 'response', None)
+        if response is not None:
+            # HTTP errors from raise_for_status carry the status code
+            return response.status_code == 429
+        # Errors reported in the response body only have the code in the message
+        error_str = str(error).lower()
+        return '429' in error_str or 'rate limit' in error_str or 'too many requests' in error_str
+    
+    def _request_deck_video(self, card: Dict[str, Any], aspect_ratio: str) -> Optional[str]:
+        """
+        Start one video generation for a deck card, backing off if rate limited.
+        
+        Args:
+            card: Card dictionary
+            aspect_ratio: Aspect ratio for the video
+            
+        Returns:
+            Task ID, or None if the task could not be created
+        """
+        def request_video() -> Optional[str]:
+            self._rate_limiter.acquire()
+            result = self.generator.generate_video(
+                prompt=card['prompt'],
+                image_urls=[card['image_url']],
+                model=Config.DEFAULT_MODEL,
+                aspect_ratio=aspect_ratio,
+                enable_translation=True,
+                generation_type=Config.DEFAULT_GENERATION_TYPE
+            )
+            return result.get('taskId')
+        
+        try:
+            return call_with_backoff(
+                request_video,
+                is_retryable=self._is_rate_limit_error,
+                max_retries=Config.RATE_LIMIT_MAX_RETRIES
+            )
+        except Exception as e:
+            logger.error(f"Error generating video for card {card['id']}: {e}")
+            return None
+    
     def generate_deck_videos(
         self,
         deck_id: str,
@@ -199,7 +284,10 @@ class VideoService:
         aspect_ratio: str
     ) -> Dict[str, Any]:
         """
-        Generate videos for all cards in a deck (batch generation with rate limiting).
+        Generate videos for all cards in a deck (with rate limiting).
+        
+        Requests are sent concurrently as fast as the shared rate limiter
+        allows.
         
         Args:
             deck_id: Deck ID
@@ -210,88 +298,45 @@ class VideoService:
             Dictionary with generation results
         """
         all_task_ids = []
-        total_requests = len(cards) * Config.VIDEOS_PER_CARD
+        jobs = [(card, i) for card in cards for i in range(Config.VIDEOS_PER_CARD)]
+        total_requests = len(jobs)
         requests_sent = 0
-        batch_size = Config.RATE_LIMIT_BATCH_SIZE
-        delay_between_batches = Config.RATE_LIMIT_DELAY_SECONDS
         
         logger.info(
             f"Generating {total_requests} videos with rate limiting "
-            f"(max {batch_size} requests per {delay_between_batches}s)..."
+            f"(max {self._rate_limiter.max_calls} requests per {self._rate_limiter.period}s)..."
         )
         
-        for card in cards:
-            for i in range(Config.VIDEOS_PER_CARD):
-                # Rate limiting: wait if we've sent a full batch
-                if requests_sent > 0 and requests_sent % batch_size == 0:
-                    logger.info(
-                        f"Rate limit: Waiting {delay_between_batches}s before next batch... "
-                        f"({requests_sent}/{total_requests} requests sent)"
-                    )
-                    time.sleep(delay_between_batches)
+        if not jobs:
+            return {'task_ids': [], 'cards': cards, 'total_requests': 0}
+        
+        max_workers = min(self._rate_limiter.max_calls, total_requests)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._request_deck_video, card, aspect_ratio)
+                for card, _ in jobs
+            ]
+            
+            # Collect in submission order so each card's task_ids stay ordered
+            for (card, i), future in zip(jobs, futures):
+                task_id = future.result()
+                if not task_id:
+                    logger.error(f"Failed to get task ID for card {card['id']}, video {i+1}")
+                    continue
                 
-                try:
-                    result = self.generator.generate_video(
-                        prompt=card['prompt'],
-                        image_urls=[card['image_url']],
-                        model=Config.DEFAULT_MODEL,
-                        aspect_ratio=aspect_ratio,
-                        enable_translation=True,
-                        generation_type=Config.DEFAULT_GENERATION_TYPE
-                    )
-                    
-                    task_id = result.get('taskId')
-                    if task_id:
-                        if 'task_ids' not in card:
-                            card['task_ids'] = []
-                        card['task_ids'].append(task_id)
-                        all_task_ids.append({
-                            'task_id': task_id,
-                            'card_id': card['id'],
-                            'deck_id': deck_id,
-                            'image_filename': card.get('image_filename', ''),
-                            'prompt': card['prompt'],
-                            'aspect_ratio': aspect_ratio
-                        })
-                        requests_sent += 1
-                        logger.info(f"Request {requests_sent}/{total_requests} sent (Task ID: {task_id})")
-                    else:
-                        logger.error(f"Failed to get task ID for card {card['id']}, video {i+1}")
-                        
-                except Exception as e:
-                    error_str = str(e).lower()
-                    if '429' in error_str or 'rate limit' in error_str or 'too many requests' in error_str:
-                        logger.warning("Rate limit hit! Waiting 10 seconds before retrying...")
-                        time.sleep(10)
-                        # Retry once
-                        try:
-                            result = self.generator.generate_video(
-                                prompt=card['prompt'],
-                                image_urls=[card['image_url']],
-                                model=Config.DEFAULT_MODEL,
-                                aspect_ratio=aspect_ratio,
-                                enable_translation=True,
-                                generation_type=Config.DEFAULT_GENERATION_TYPE
-                            )
-                            task_id = result.get('taskId')
-                            if task_id:
-                                if 'task_ids' not in card:
-                                    card['task_ids'] = []
-                                card['task_ids'].append(task_id)
-                                all_task_ids.append({
-                                    'task_id': task_id,
-                                    'card_id': card['id'],
-                                    'deck_id': deck_id,
-                                    'image_filename': card.get('image_filename', ''),
-                                    'prompt': card['prompt'],
-                                    'aspect_ratio': aspect_ratio
-                                })
-                                requests_sent += 1
-                                logger.info(f"Retry successful: Request {requests_sent}/{total_requests} sent")
-                        except Exception as retry_error:
-                            logger.error(f"Retry failed: {retry_error}")
-                    else:
-                        logger.error(f"Error generating video for card {card['id']}, video {i+1}: {e}")
+                if 'task_ids' not in card:
+                    card['task_ids'] = []
+                card['task_ids'].append(task_id)
+                all_task_ids.append({
+                    'task_id': task_id,
+                    'card_id': card['id'],
+                    'deck_id': deck_id,
+                    'image_filename': card.get('image_filename', ''),
+                    'prompt': card['prompt'],
+                    'aspect_ratio': aspect_ratio
+                })
+                requests_sent += 1
+                logger.info("Request %d/%d sent (Task ID: %s)", requests_sent, total_requests, task_id)
         
         return {
             'task_ids': all_task_ids,
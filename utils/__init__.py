@@ -1,18 +1,37 @@
 """Utility functions and helpers."""
 from .file_utils import generate_unique_filename, ensure_directory_exists
-from .azure_utils import get_azure_blob_service_client, upload_to_azure_blob, download_and_upload_video
+from .azure_utils import (
+    get_azure_blob_service_client,
+    get_azure_container_client,
+    get_blob_url,
+    upload_stream_to_azure_blob,
+    upload_to_azure_blob,
+    transfer_video_to_azure_blob,
+    stream_video_to_azure_blob,
+    download_and_upload_video,
+)
 from .json_utils import load_json_file, save_json_file
 from .validation import validate_image_file, validate_deck_name
+from .time_utils import now_iso
+from .rate_limiter import RateLimiter, call_with_backoff
 
 __all__ = [
     'generate_unique_filename',
     'ensure_directory_exists',
     'get_azure_blob_service_client',
+    'get_azure_container_client',
+    'get_blob_url',
+    'upload_stream_to_azure_blob',
     'upload_to_azure_blob',
+    'transfer_video_to_azure_blob',
+    'stream_video_to_azure_blob',
     'download_and_upload_video',
     'load_json_file',
     'save_json_file',
     'validate_image_file',
     'validate_deck_name',
+    'now_iso',
+    'RateLimiter',
+    'call_with_backoff',
 ]
 
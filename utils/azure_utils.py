@@ -1,19 +1,63 @@
 """Azure Blob Storage utility functions."""
 import os
+import base64
 import logging
+import mmap
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from typing import Optional
-from azure.storage.blob import BlobServiceClient
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import IO, Optional
+from azure.storage.blob import BlobServiceClient, ContainerClient, BlobBlock
 from azure.core.exceptions import AzureError
+from azure.core.pipeline.transport import RequestsTransport
 
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Shared client so uploads reuse pooled TLS connections instead of
+# negotiating a new one per call (the SDK clients are thread-safe)
+_blob_service_client: Optional[BlobServiceClient] = None
+_blob_service_client_lock = threading.Lock()
+_container_client: Optional[ContainerClient] = None
+
+# Shared session for video downloads
+_download_session: Optional[requests.Session] = None
+_download_session_lock = threading.Lock()
+
+# Public URL of the container; blob URLs append the blob name
+_BLOB_URL_PREFIX = (
+    f"https://{Config.AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net/"
+    f"{Config.AZURE_CONTAINER_NAME}/"
+)
+
+
+def _create_azure_transport() -> RequestsTransport:
+    """
+    Create the HTTP transport used by the Azure SDK.
+    
+    Returns:
+        RequestsTransport backed by a session with an enlarged connection pool
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=Config.AZURE_CONNECTION_POOL_SIZE,
+        pool_maxsize=Config.AZURE_CONNECTION_POOL_SIZE
+    )
+    session.mount('https://', adapter)
+    return RequestsTransport(
+        session=session,
+        session_owner=False,
+        connection_timeout=Config.AZURE_CONNECTION_TIMEOUT
+    )
+
 
 def get_azure_blob_service_client() -> BlobServiceClient:
     """
-    Create and return Azure Blob Service Client.
+    Get the shared Azure Blob Service Client, creating it on first use.
     
     Returns:
         BlobServiceClient instance
@@ -21,23 +65,72 @@ def get_azure_blob_service_client() -> BlobServiceClient:
     Raises:
         ValueError: If Azure credentials are not configured
     """
+    global _blob_service_client
+    
+    if _blob_service_client is not None:
+        return _blob_service_client
+    
     if not Config.AZURE_STORAGE_ACCOUNT_NAME or not Config.AZURE_STORAGE_ACCOUNT_KEY:
         raise ValueError("Azure Storage credentials not configured")
     
-    connection_string = Config.get_azure_connection_string()
-    return BlobServiceClient.from_connection_string(connection_string)
+    with _blob_service_client_lock:
+        if _blob_service_client is None:
+            connection_string = Config.get_azure_connection_string()
+            _blob_service_client = BlobServiceClient.from_connection_string(
+                connection_string,
+                transport=_create_azure_transport(),
+                max_single_put_size=Config.AZURE_MAX_SINGLE_PUT_SIZE,
+                max_block_size=Config.AZURE_MAX_BLOCK_SIZE
+            )
+            logger.debug("Created shared Azure BlobServiceClient")
+    return _blob_service_client
 
 
-def upload_to_azure_blob(local_file_path: str, blob_name: str) -> str:
+def get_azure_container_client() -> ContainerClient:
     """
-    Upload a file to Azure Blob Storage.
+    Get the shared client for the configured container.
     
-    Note: This function preserves the original file quality - no compression,
-    resizing, or image processing is applied.
+    Returns:
+        ContainerClient for AZURE_CONTAINER_NAME (shares the service
+        client's connection pool)
+        
+    Raises:
+        ValueError: If Azure credentials are not configured
+    """
+    global _container_client
+    
+    if _container_client is None:
+        service_client = get_azure_blob_service_client()
+        with _blob_service_client_lock:
+            if _container_client is None:
+                _container_client = service_client.get_container_client(Config.AZURE_CONTAINER_NAME)
+    return _container_client
+
+
+def get_blob_url(blob_name: str) -> str:
+    """
+    Construct the public URL of a blob.
     
     Args:
-        local_file_path: Path to local file
+        blob_name: Name of the blob in Azure
+        
+    Returns:
+        Public URL of the blob
+    """
+    return _BLOB_URL_PREFIX + blob_name
+
+
+def upload_stream_to_azure_blob(data: IO[bytes], blob_name: str, length: Optional[int] = None) -> str:
+    """
+    Upload a file-like object to Azure Blob Storage.
+    
+    The stream is consumed as-is - no compression, resizing, or image
+    processing is applied.
+    
+    Args:
+        data: Readable binary stream positioned at the start of the content
         blob_name: Name for the blob in Azure
+        length: Number of bytes to upload (determined by the SDK if omitted)
         
     Returns:
         Public URL of the uploaded blob
@@ -46,21 +139,17 @@ def upload_to_azure_blob(local_file_path: str, blob_name: str) -> str:
         Exception: If upload fails
     """
     try:
-        blob_service_client = get_azure_blob_service_client()
-        blob_client = blob_service_client.get_blob_client(
-            container=Config.AZURE_CONTAINER_NAME,
-            blob=blob_name
-        )
+        blob_client = get_azure_container_client().get_blob_client(blob_name)
         
-        # Upload the file in binary mode - preserves original quality
-        with open(local_file_path, "rb") as data:
-            blob_client.upload_blob(data, overwrite=True)
-        
-        # Construct the public URL
-        blob_url = (
-            f"https://{Config.AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net/"
-            f"{Config.AZURE_CONTAINER_NAME}/{blob_name}"
+        # Blobs larger than AZURE_MAX_SINGLE_PUT_SIZE are sent as blocks in parallel
+        blob_client.upload_blob(
+            data,
+            length=length,
+            overwrite=True,
+            max_concurrency=Config.AZURE_UPLOAD_CONCURRENCY
         )
+        
+        blob_url = get_blob_url(blob_name)
         logger.info(f"Successfully uploaded {blob_name} to Azure")
         return blob_url
     
@@ -72,6 +161,53 @@ def upload_to_azure_blob(local_file_path: str, blob_name: str) -> str:
         raise Exception(f"Failed to upload to Azure: {str(e)}")
 
 
+def upload_to_azure_blob(local_file_path: str, blob_name: str) -> str:
+    """
+    Upload a file to Azure Blob Storage.
+    
+    Note: This function preserves the original file quality - no compression,
+    resizing, or image processing is applied.
+    
+    Args:
+        local_file_path: Path to local file
+        blob_name: Name for the blob in Azure
+        
+    Returns:
+        Public URL of the uploaded blob
+        
+    Raises:
+        Exception: If upload fails
+    """
+    # Upload the file in binary mode - preserves original quality. Passing
+    # the size lets the SDK plan parallel block uploads without probing.
+    with open(local_file_path, "rb") as data:
+        size = os.fstat(data.fileno()).st_size
+        if not size:
+            # Empty files can't be memory-mapped
+            return upload_stream_to_azure_blob(data, blob_name, length=0)
+        # Blocks are sliced from the page cache instead of read() through
+        # the buffered file object
+        with mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return upload_stream_to_azure_blob(mapped, blob_name, length=size)
+
+
+def _remove_file(path: str) -> bool:
+    """
+    Delete a file, ignoring it if it does not exist.
+    
+    Args:
+        path: Path of the file to delete
+        
+    Returns:
+        True if a file was deleted
+    """
+    try:
+        os.unlink(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
 def download_video(video_url: str, local_path: str, timeout: int = 300) -> bool:
     """
     Download a video from a URL to a local file.
@@ -85,15 +221,15 @@ def download_video(video_url: str, local_path: str, timeout: int = 300) -> bool:
         True if successful, False otherwise
     """
     try:
-        response = requests.get(video_url, stream=True, timeout=timeout)
-        response.raise_for_status()
-        
-        os.makedirs(os.path.dirname(local_path) if os.path.dirname(local_path) else '.', exist_ok=True)
-        
-        with open(local_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
+        with _get_download_session().get(video_url, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            
+            os.makedirs(os.path.dirname(local_path) if os.path.dirname(local_path) else '.', exist_ok=True)
+            
+            # Copy the raw stream in large blocks without a Python-level chunk loop
+            response.raw.decode_content = True
+            with open(local_path, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, length=Config.DOWNLOAD_CHUNK_SIZE)
         
         logger.info(f"Successfully downloaded video to {local_path}")
         return True
@@ -102,6 +238,137 @@ def download_video(video_url: str, local_path: str, timeout: int = 300) -> bool:
         return False
 
 
+def _get_download_session() -> requests.Session:
+    """
+    Get the shared session used for video downloads.
+    
+    Keeps connections to the Veo CDN alive across downloads and range
+    requests, and retries transient gateway errors.
+    
+    Returns:
+        requests.Session with a pooled, retrying HTTPAdapter
+    """
+    global _download_session
+    
+    if _download_session is None:
+        with _download_session_lock:
+            if _download_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=20,
+                    pool_maxsize=Config.DOWNLOAD_POOL_SIZE,
+                    max_retries=Retry(
+                        total=3,
+                        backoff_factor=0.3,
+                        status_forcelist=[502, 503, 504]
+                    )
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _download_session = session
+    return _download_session
+
+
+def transfer_video_to_azure_blob(video_url: str, blob_name: str, timeout: int = 300) -> Optional[str]:
+    """
+    Copy a video into Azure Storage with parallel ranged transfers.
+    
+    The video is fetched in AZURE_MAX_BLOCK_SIZE byte ranges by
+    AZURE_UPLOAD_CONCURRENCY workers. Each range is staged as a block as
+    soon as it arrives, and the block list is committed at the end. At
+    most block size x concurrency bytes are held in memory and nothing is
+    written to disk.
+    
+    Args:
+        video_url: URL of the video to copy
+        blob_name: Name for the blob in Azure
+        timeout: Request timeout in seconds
+        
+    Returns:
+        Public URL of the uploaded blob, or None if the source does not
+        support range requests
+        
+    Raises:
+        Exception: If a range download or block upload fails
+    """
+    session = _get_download_session()
+    head = session.head(video_url, allow_redirects=True, timeout=timeout)
+    total_size = int(head.headers.get('Content-Length') or 0)
+    if (
+        not head.ok
+        or head.headers.get('Accept-Ranges', '').lower() != 'bytes'
+        or total_size <= 0
+    ):
+        return None
+    
+    block_size = Config.AZURE_MAX_BLOCK_SIZE
+    ranges = [
+        (index, start, min(start + block_size, total_size) - 1)
+        for index, start in enumerate(range(0, total_size, block_size))
+    ]
+    blob_client = get_azure_container_client().get_blob_client(blob_name)
+    
+    def transfer_range(byte_range) -> str:
+        index, start, end = byte_range
+        response = session.get(
+            head.url,
+            headers={'Range': f"bytes={start}-{end}"},
+            timeout=timeout
+        )
+        response.raise_for_status()
+        data = response.content
+        if response.status_code != 206 or len(data) != end - start + 1:
+            raise Exception(f"Unexpected range response for bytes {start}-{end} ({response.status_code})")
+        
+        # Block IDs must all have the same length
+        block_id = base64.b64encode(f"{index:08d}".encode()).decode()
+        blob_client.stage_block(block_id, data, length=len(data))
+        return block_id
+    
+    max_workers = min(len(ranges), Config.AZURE_UPLOAD_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        block_ids = list(executor.map(transfer_range, ranges))
+    
+    blob_client.commit_block_list([BlobBlock(block_id=block_id) for block_id in block_ids])
+    
+    logger.info(
+        f"Transferred {total_size / 1024 / 1024:.2f} MB to {blob_name} "
+        f"in {len(ranges)} block(s)"
+    )
+    return get_blob_url(blob_name)
+
+
+def stream_video_to_azure_blob(video_url: str, blob_name: str, timeout: int = 300) -> Optional[str]:
+    """
+    Pipe a video download straight into an Azure upload.
+    
+    The response body is handed to upload_blob as a stream, so downloading
+    and uploading overlap and nothing is written to disk.
+    
+    Args:
+        video_url: URL of the video to copy
+        blob_name: Name for the blob in Azure
+        timeout: Request timeout in seconds
+        
+    Returns:
+        Public URL of the uploaded blob, or None if the response has no
+        usable Content-Length (e.g. chunked or content-encoded)
+        
+    Raises:
+        Exception: If the download or upload fails
+    """
+    with _get_download_session().get(video_url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        length = int(response.headers.get('Content-Length') or 0)
+        if length <= 0 or response.headers.get('Content-Encoding'):
+            return None
+        
+        blob_url = upload_stream_to_azure_blob(response.raw, blob_name, length=length)
+    
+    logger.info(f"Streamed {length / 1024 / 1024:.2f} MB to {blob_name}")
+    return blob_url
+
+
 def download_and_upload_video(
     video_url: str,
     base_filename: str,
@@ -110,6 +377,10 @@ def download_and_upload_video(
     """
     Download video from Veo API and upload to Azure Storage.
     
+    Uses a parallel ranged transfer when the source supports it, then a
+    single streamed transfer, and falls back to downloading to a temporary
+    file only if neither works.
+    
     Args:
         video_url: URL of the video from Veo API
         base_filename: Base filename (without extension) to use for the video
@@ -121,6 +392,19 @@ def download_and_upload_video(
     try:
         # Generate video filename
         video_filename = f"{base_filename}.mp4"
+        blob_name = f"{Config.AZURE_BLOB_PATH_OUTPUT}{video_filename}"
+        
+        for transfer in (transfer_video_to_azure_blob, stream_video_to_azure_blob):
+            try:
+                blob_url = transfer(video_url, blob_name)
+                if blob_url:
+                    logger.info(f"Video successfully uploaded to Azure: {blob_url}")
+                    return blob_url
+                logger.debug("%s not possible for %s", transfer.__name__, video_url)
+            except Exception as e:
+                logger.warning(f"{transfer.__name__} failed for {video_url}: {e}")
+        
+        logger.info("Falling back to temporary file for %s", video_url)
         
         # Ensure uploads directory exists
         os.makedirs(upload_folder, exist_ok=True)
@@ -133,24 +417,24 @@ def download_and_upload_video(
             logger.warning(f"Failed to download video from Veo API: {video_url}")
             return None
         
-        # Check if file was downloaded successfully
-        if not os.path.exists(temp_video_path) or os.path.getsize(temp_video_path) == 0:
+        # Check if file was downloaded successfully (one stat call)
+        try:
+            file_size = os.path.getsize(temp_video_path)
+        except OSError:
+            file_size = 0
+        if file_size == 0:
             logger.warning(f"Downloaded video file is empty or doesn't exist: {temp_video_path}")
-            if os.path.exists(temp_video_path):
-                os.remove(temp_video_path)
+            _remove_file(temp_video_path)
             return None
         
-        file_size = os.path.getsize(temp_video_path)
         logger.info(f"Video downloaded successfully ({file_size / 1024 / 1024:.2f} MB)")
         
         # Upload to Azure
-        blob_name = f"{Config.AZURE_BLOB_PATH_OUTPUT}{video_filename}"
         logger.info(f"Uploading to Azure: {blob_name}")
         blob_url = upload_to_azure_blob(temp_video_path, blob_name)
         
         # Clean up local file
-        if os.path.exists(temp_video_path):
-            os.remove(temp_video_path)
+        if _remove_file(temp_video_path):
             logger.info(f"Cleaned up temporary file: {temp_video_path}")
         
         logger.info(f"Video successfully uploaded to Azure: {blob_url}")
@@ -159,11 +443,9 @@ def download_and_upload_video(
     except Exception as e:
         logger.error(f"Error in download_and_upload_video: {e}", exc_info=True)
         # Clean up any partial files
-        temp_video_path = os.path.join(upload_folder, f"{base_filename}.mp4")
-        if os.path.exists(temp_video_path):
-            try:
-                os.remove(temp_video_path)
-            except Exception:
-                pass
+        try:
+            _remove_file(os.path.join(upload_folder, f"{base_filename}.mp4"))
+        except OSError:
+            pass
         return None
 
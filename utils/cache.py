@@ -0,0 +1,112 @@
+"""Response cache for read-heavy API endpoints."""
+import hashlib
+import logging
+from functools import wraps
+from typing import Callable
+
+from flask import Flask, Response, make_response, request
+from flask_caching import Cache
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Cache keys for views decorated with a fixed key_prefix
+VIDEO_HISTORY_CACHE_KEY = 'video_history_v1'
+DECKS_CACHE_KEY = 'decks_v1'
+DECK_VIDEOS_CACHE_PREFIX = 'deck_videos_v1:'
+
+cache = Cache()
+
+
+def init_cache(app: Flask) -> None:
+    """
+    Configure the shared cache for the Flask app.
+    
+    Uses Redis when REDIS_URL is set so all workers share entries and
+    invalidations, otherwise an in-process cache.
+    
+    Args:
+        app: Flask application
+    """
+    if Config.REDIS_URL:
+        cache_config = {'CACHE_TYPE': 'RedisCache', 'CACHE_REDIS_URL': Config.REDIS_URL}
+    else:
+        cache_config = {'CACHE_TYPE': 'SimpleCache'}
+    cache_config['CACHE_DEFAULT_TIMEOUT'] = Config.API_CACHE_TIMEOUT
+    
+    cache.init_app(app, config=cache_config)
+    # Lets storage code invalidate entries outside a request (e.g. the task poller)
+    cache.app = app
+    logger.debug(f"Response cache initialized ({cache_config['CACHE_TYPE']})")
+
+
+def is_success_response(rv) -> bool:
+    """
+    Decide whether a view result may be cached.
+    
+    Error responses are returned as (response, status) tuples and are
+    never cached.
+    
+    Args:
+        rv: Value returned by the view function
+        
+    Returns:
+        True if the result should be cached
+    """
+    return not isinstance(rv, tuple)
+
+
+def invalidate(key: str) -> None:
+    """
+    Remove a cached response.
+    
+    Args:
+        key: Cache key to delete
+    """
+    if cache.app is None:
+        return
+    try:
+        cache.delete(key)
+    except Exception as e:
+        logger.warning(f"Could not invalidate cache key {key}: {e}")
+
+
+def _etag_matches(etag: str) -> bool:
+    """Check If-None-Match, also accepting the :<algorithm> suffix Flask-Compress adds."""
+    if_none_match = request.if_none_match
+    if if_none_match.star_tag:
+        return True
+    return any(
+        tag == etag or tag.startswith(f"{etag}:")
+        for tag in if_none_match.as_set(include_weak=True)
+    )
+
+
+def conditional(view: Callable) -> Callable:
+    """
+    Answer a GET view with 304 Not Modified while its body is unchanged.
+    
+    The ETag is a hash of the body actually served, so a stale body from
+    @cache.cached can never be stamped with a newer version's tag. Must be
+    applied outside @cache.cached, which keeps the view itself cheap.
+    
+    Args:
+        view: View function
+        
+    Returns:
+        Wrapped view
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        response = make_response(view(*args, **kwargs))
+        if response.status_code != 200:
+            return response
+        etag = hashlib.blake2b(response.get_data(), digest_size=8).hexdigest()
+        if _etag_matches(etag):
+            response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        # Let browsers keep the body but revalidate on every poll
+        response.cache_control.no_cache = True
+        return response
+    return wrapper
@@ -19,9 +19,9 @@ def generate_unique_filename(original_filename: str) -> str:
         Unique filename string
     """
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    unique_id = str(uuid.uuid4())[:8]
-    _, ext = os.path.splitext(original_filename)
-    base_name = secure_filename(os.path.splitext(original_filename)[0])
+    unique_id = uuid.uuid4().hex[:8]
+    name, ext = os.path.splitext(original_filename)
+    base_name = secure_filename(name)
     
     # Limit base name length
     if len(base_name) > 50:
@@ -0,0 +1,76 @@
+"""Flask JSON provider backed by orjson."""
+from typing import Any, Union
+
+import orjson
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes with orjson.
+    
+    Used for every jsonify() response and request.get_json() call. Types
+    orjson does not handle natively fall back to Flask's default serializer.
+    
+    Keys are emitted in insertion order and responses are always compact
+    (also in debug mode); sorting and indenting large deck payloads only
+    costs CPU and bandwidth.
+    """
+    
+    sort_keys = False
+    compact = True
+    
+    def _option(self, sort_keys: bool, indent: bool) -> int:
+        """Build the orjson option flags."""
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """
+        Serialize data as JSON.
+        
+        Args:
+            obj: Data to serialize
+            **kwargs: Formatting arguments passed by Flask (indent is honored)
+            
+        Returns:
+            JSON string
+        """
+        option = self._option(kwargs.get('sort_keys', self.sort_keys), bool(kwargs.get('indent')))
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+    
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        """
+        Deserialize JSON data.
+        
+        Args:
+            s: JSON text or bytes
+            **kwargs: Ignored
+            
+        Returns:
+            Deserialized data
+        """
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """
+        Serialize the given arguments as a JSON response (used by jsonify).
+        
+        The body is built from orjson's bytes output directly, skipping the
+        decode/re-encode round trip dumps() would need.
+        
+        Returns:
+            Response with an application/json body
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        option = self._option(self.sort_keys, indent) | orjson.OPT_APPEND_NEWLINE
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option),
+            mimetype=self.mimetype
+        )
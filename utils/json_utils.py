@@ -1,11 +1,23 @@
 """JSON file utility functions."""
 import os
-import json
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+
+import orjson
+
+try:
+    import fcntl
+except ImportError:  # Windows: mutations are only serialized within a process
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
+# One lock per destination path so threads writing the same file take turns
+_write_locks: Dict[str, threading.Lock] = {}
+_write_locks_guard = threading.Lock()
+
 
 def load_json_file(file_path: str, default: Any = None) -> Any:
     """
@@ -19,15 +31,15 @@ def load_json_file(file_path: str, default: Any = None) -> Any:
         Loaded data or default value
     """
     if not os.path.exists(file_path):
-        logger.debug(f"JSON file not found: {file_path}, returning default")
+        logger.debug("JSON file not found: %s, returning default", file_path)
         return default if default is not None else []
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            logger.debug(f"Successfully loaded JSON file: {file_path}")
+        with open(file_path, 'rb') as f:
+            data = orjson.loads(f.read())
+            logger.debug("Successfully loaded JSON file: %s", file_path)
             return data
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"Invalid JSON in file {file_path}: {e}")
         return default if default is not None else []
     except IOError as e:
@@ -35,31 +47,85 @@ def load_json_file(file_path: str, default: Any = None) -> Any:
         return default if default is not None else []
 
 
-def save_json_file(file_path: str, data: Any, indent: int = 2) -> bool:
+def _dump_json(data: Any, indent: Optional[int] = 2) -> bytes:
+    """Serialize data the way JSON files are stored on disk."""
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+    return orjson.dumps(data, option=option)
+
+
+def _get_write_lock(file_path: str) -> threading.Lock:
+    """Get the lock serializing writes to a file."""
+    with _write_locks_guard:
+        lock = _write_locks.get(file_path)
+        if lock is None:
+            lock = _write_locks[file_path] = threading.Lock()
+        return lock
+
+
+def _write_file_atomic(file_path: str, raw: bytes) -> Optional[Tuple[int, int]]:
     """
-    Save data to a JSON file.
+    Write bytes to a file via a temporary file and rename.
+    
+    The temporary file is fsynced before it replaces the target, so after a
+    crash the file holds either the old or the new contents in full.
     
     Args:
-        file_path: Path to the JSON file
-        data: Data to save
-        indent: JSON indentation level
+        file_path: Destination path
+        raw: File contents
         
     Returns:
-        True if successful, False otherwise
+        (mtime_ns, size) of the written file, or None if writing failed
     """
+    temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
     try:
         # Ensure directory exists
         directory = os.path.dirname(file_path)
         if directory and not os.path.exists(directory):
             os.makedirs(directory, exist_ok=True)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=indent, ensure_ascii=False)
-        logger.debug(f"Successfully saved JSON file: {file_path}")
-        return True
+        with _get_write_lock(file_path):
+            with open(temp_path, 'wb') as f:
+                f.write(raw)
+                f.flush()
+                os.fsync(f.fileno())
+                stat = os.fstat(f.fileno())
+            # The rename keeps the temp file's mtime, so this is the target's version
+            os.replace(temp_path, file_path)
+        return (stat.st_mtime_ns, stat.st_size)
     except IOError as e:
         logger.error(f"Error saving file {file_path}: {e}")
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        return None
+
+
+def save_json_file(file_path: str, data: Any, indent: Optional[int] = 2) -> bool:
+    """
+    Save data to a JSON file.
+    
+    The data is written to a temporary file in the same directory which
+    then replaces the target, so readers never see a partially written file.
+    
+    Args:
+        file_path: Path to the JSON file
+        data: Data to save
+        indent: Indent output with 2 spaces if set, compact otherwise
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        raw = _dump_json(data, indent)
+    except TypeError as e:
+        logger.error(f"Error saving file {file_path}: {e}")
+        return False
+    
+    if _write_file_atomic(file_path, raw) is None:
         return False
+    logger.debug("Successfully saved JSON file: %s", file_path)
+    return True
 
 
 def append_to_json_list(file_path: str, item: Dict[str, Any], max_items: Optional[int] = None) -> bool:
@@ -88,3 +154,145 @@ def append_to_json_list(file_path: str, item: Dict[str, Any], max_items: Optiona
     
     return save_json_file(file_path, data)
 
+
+
+class CachedJSONFile:
+    """
+    JSON file whose contents are kept in memory until the file changes.
+    
+    The raw file bytes are cached together with the file's mtime and size,
+    so a load only touches the disk when the file was modified (by this
+    process or any other). Every load still parses the cached bytes, which
+    gives each caller its own copy it can mutate before saving.
+    """
+    
+    def __init__(self, file_path: str, default: Any = None):
+        """
+        Initialize cached JSON file.
+        
+        Args:
+            file_path: Path to the JSON file
+            default: Default value returned if the file doesn't exist or is
+                invalid (defaults to an empty list)
+        """
+        self.file_path = file_path
+        self.default = default
+        self._cache: Optional[Tuple[Tuple[int, int], bytes]] = None
+        self._lock = threading.Lock()
+        self._mutation_lock = threading.RLock()
+        self._mutation_depth = 0
+        self._lock_file = None
+    
+    def _default(self) -> Any:
+        return self.default if self.default is not None else []
+    
+    def version(self) -> Optional[Tuple[int, int]]:
+        """
+        Get a token that changes whenever the file changes.
+        
+        Returns:
+            (mtime_ns, size) tuple, or None if the file doesn't exist
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """
+        Hold the file's mutation lock for a load-modify-save cycle.
+        
+        Serializes threads in this process and, through an flock on a
+        `<file>.lock` sidecar, every other process using the file, so
+        gunicorn workers don't overwrite each other's changes. Re-entrant
+        within a thread.
+        """
+        with self._mutation_lock:
+            if self._mutation_depth == 0 and fcntl is not None:
+                self._lock_file = open(f"{self.file_path}.lock", 'a')
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            self._mutation_depth += 1
+            try:
+                yield
+            finally:
+                self._mutation_depth -= 1
+                if self._mutation_depth == 0 and self._lock_file is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                    self._lock_file.close()
+                    self._lock_file = None
+    
+    def load(self) -> Any:
+        """
+        Load data, rereading the file only if it changed.
+        
+        Returns:
+            Loaded data or default value
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            logger.debug("JSON file not found: %s, returning default", self.file_path)
+            return self._default()
+        except OSError as e:
+            logger.error(f"Error reading file {self.file_path}: {e}")
+            return self._default()
+        
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cache = self._cache
+        if cache is not None and cache[0] == version:
+            return orjson.loads(cache[1])
+        
+        try:
+            with open(self.file_path, 'rb') as f:
+                raw = f.read()
+            data = orjson.loads(raw)
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in file {self.file_path}: {e}")
+            return self._default()
+        except IOError as e:
+            logger.error(f"Error reading file {self.file_path}: {e}")
+            return self._default()
+        
+        with self._lock:
+            self._cache = (version, raw)
+        logger.debug("Successfully loaded JSON file: %s", self.file_path)
+        return data
+    
+    def save(self, data: Any) -> bool:
+        """
+        Save data to the file, keeping the written bytes as the cached copy.
+        
+        The write is skipped when the data is identical to the current file
+        contents, so no-op saves leave the file (and its version) untouched.
+        
+        Args:
+            data: Data to save
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            raw = _dump_json(data)
+        except TypeError as e:
+            logger.error(f"Error saving file {self.file_path}: {e}")
+            return False
+        
+        with self._lock:
+            cache = self._cache
+        if cache is not None and cache[1] == raw and cache[0] == self.version():
+            logger.debug("JSON file unchanged, skipping write: %s", self.file_path)
+            return True
+        
+        with self._lock:
+            self._cache = None
+        version = _write_file_atomic(self.file_path, raw)
+        if version is None:
+            return False
+        
+        with self._lock:
+            self._cache = (version, raw)
+        logger.debug("Successfully saved JSON file: %s", self.file_path)
+        return True
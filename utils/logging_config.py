@@ -1,5 +1,8 @@
 """Logging configuration."""
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 import os
 from datetime import datetime
@@ -23,14 +26,26 @@ def get_timestamped_log_filename(base_name: str = "app") -> str:
     return os.path.join(logs_dir, f"{base_name}_{timestamp}.log")
 
 
-def setup_logging(level: str = "INFO", log_file: Optional[str] = None, use_timestamp: bool = True) -> str:
+def setup_logging(
+    level: str = "INFO",
+    log_file: Optional[str] = None,
+    use_timestamp: bool = True,
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5
+) -> str:
     """
     Configure application logging.
     
+    Log records are handed to a queue and written to the console and log file
+    by a background listener thread, so request handlers never block on
+    log I/O.
+    
     Args:
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Optional log file path (if None and use_timestamp=True, generates timestamped filename)
         use_timestamp: If True and log_file is None, creates a timestamped log file
+        max_bytes: Size at which a log file is rotated (0 disables rotation)
+        backup_count: Number of rotated log files to keep
         
     Returns:
         Path to the log file being used
@@ -48,10 +63,7 @@ def setup_logging(level: str = "INFO", log_file: Optional[str] = None, use_times
     console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
     
-    # Root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(log_level)
-    root_logger.addHandler(console_handler)
+    handlers: list[logging.Handler] = [console_handler]
     
     # File handler
     actual_log_file = log_file
@@ -70,10 +82,30 @@ def setup_logging(level: str = "INFO", log_file: Optional[str] = None, use_times
         if log_dir:
             os.makedirs(log_dir, exist_ok=True)
         
-        file_handler = logging.FileHandler(actual_log_file, mode='w')  # 'w' mode overwrites, but we create new file each run
+        # Appends across restarts; rotation keeps a single long-lived file bounded
+        file_handler = logging.handlers.RotatingFileHandler(
+            actual_log_file,
+            mode='a',
+            maxBytes=max_bytes,
+            backupCount=backup_count
+        )
         file_handler.setLevel(log_level)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    # Root logger only enqueues records; the listener thread does the writing
+    log_queue: queue.Queue = queue.Queue(-1)
+    root_logger = logging.getLogger()
+    root_logger.setLevel(log_level)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    
+    listener = logging.handlers.QueueListener(
+        log_queue,
+        *handlers,
+        respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
     
     # Set specific loggers
     logging.getLogger('werkzeug').setLevel(logging.WARNING)
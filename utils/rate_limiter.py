@@ -0,0 +1,135 @@
+"""Rate limiting utilities."""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Deque, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class RateLimiter:
+    """
+    Allow at most `max_calls` calls in any `period` second window.
+    
+    Keeps the start times of recent calls, so a new call may start as soon
+    as the oldest call in the window is `period` seconds old. Unlike fixed
+    batches separated by a sleep, no time is lost waiting after a batch that
+    itself took a while. Thread-safe; one instance should be shared by all
+    callers of the limited API.
+    """
+    
+    def __init__(self, max_calls: int, period: float):
+        """
+        Initialize rate limiter.
+        
+        Args:
+            max_calls: Maximum number of calls per window
+            period: Window length in seconds
+        """
+        self.max_calls = max_calls
+        self.period = period
+        self._calls: Deque[float] = deque()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Block until a call may be made, then record it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and self._calls[0] <= now - self.period:
+                    self._calls.popleft()
+                if len(self._calls) < self.max_calls:
+                    self._calls.append(now)
+                    return
+                wait = self._calls[0] + self.period - now
+            time.sleep(wait)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Get the wait requested by the server for a rate-limited request.
+    
+    Reads Retry-After (seconds or HTTP date) or X-RateLimit-Reset (epoch
+    seconds or a delay) from the response attached to a requests error.
+    
+    Args:
+        error: Exception raised for the request
+        
+    Returns:
+        Seconds to wait, or None if the server gave no hint
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    
+    retry_after = headers.get('Retry-After')
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+    
+    reset = headers.get('X-RateLimit-Reset')
+    if reset:
+        try:
+            reset_value = float(reset)
+        except ValueError:
+            return None
+        # Large values are absolute epoch timestamps, small ones a delay
+        return max(0.0, reset_value - time.time()) if reset_value > 1e9 else reset_value
+    return None
+
+
+def call_with_backoff(
+    fn: Callable[..., T],
+    *args: Any,
+    is_retryable: Callable[[Exception], bool],
+    max_retries: int = 5,
+    max_delay: float = 60.0,
+    **kwargs: Any
+) -> T:
+    """
+    Call a function, retrying retryable errors with exponential backoff.
+    
+    Waits the server's Retry-After when given, otherwise 2^attempt seconds
+    (capped at `max_delay`) plus up to a second of jitter, so concurrent
+    callers don't retry in lockstep.
+    
+    Args:
+        fn: Function to call
+        *args: Positional arguments for fn
+        is_retryable: Returns True for errors worth retrying
+        max_retries: Maximum number of retries after the first attempt
+        max_delay: Upper bound for a single wait in seconds
+        **kwargs: Keyword arguments for fn
+        
+    Returns:
+        Result of fn
+        
+    Raises:
+        Exception: The last error if it is not retryable or retries ran out
+    """
+    attempt = 0
+    while True:
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            attempt += 1
+            if attempt > max_retries or not is_retryable(e):
+                raise
+            delay = retry_after_seconds(e)
+            if delay is None:
+                delay = min(max_delay, 2 ** attempt) + random.random()
+            delay = min(delay, max_delay)
+            logger.warning(f"Rate limited, retrying in {delay:.1f}s (attempt {attempt}/{max_retries})")
+            time.sleep(delay)
@@ -0,0 +1,26 @@
+"""Time utility functions."""
+import time
+from datetime import datetime
+
+# (timestamp string, time.time() when it was generated)
+_now_cache = ('', 0.0)
+
+
+def now_iso() -> str:
+    """
+    Get the current local time as an ISO 8601 string, cached for one second.
+    
+    Only for record-keeping timestamps (created_at/updated_at fields);
+    the value may lag the real time by up to a second.
+    
+    Returns:
+        ISO 8601 timestamp
+    """
+    global _now_cache
+    
+    now = time.time()
+    cached, generated_at = _now_cache
+    if now - generated_at >= 1.0:
+        cached = datetime.fromtimestamp(now).isoformat()
+        _now_cache = (cached, now)
+    return cached
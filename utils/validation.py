@@ -3,6 +3,15 @@ from werkzeug.datastructures import FileStorage
 from typing import Optional
 from config import Config
 
+VALID_ASPECT_RATIOS = frozenset({'16:9', '9:16', '1:1', 'Auto'})
+
+# Lets str.endswith test every allowed extension in one call
+_ALLOWED_IMAGE_SUFFIXES = tuple(f".{ext}" for ext in sorted(Config.ALLOWED_IMAGE_EXTENSIONS))
+
+# Error message lists, sorted so they don't vary with set ordering
+_ALLOWED_IMAGE_EXTENSIONS_TEXT = ', '.join(sorted(Config.ALLOWED_IMAGE_EXTENSIONS))
+_VALID_ASPECT_RATIOS_TEXT = ', '.join(sorted(VALID_ASPECT_RATIOS))
+
 
 def validate_image_file(file: Optional[FileStorage]) -> tuple[bool, Optional[str]]:
     """
@@ -24,12 +33,8 @@ def validate_image_file(file: Optional[FileStorage]) -> tuple[bool, Optional[str
     if '.' not in file.filename:
         return False, "Invalid file type. File must have an extension."
     
-    extension = file.filename.rsplit('.', 1)[1].lower()
-    if extension not in Config.ALLOWED_IMAGE_EXTENSIONS:
-        return False, (
-            f"Invalid file type. Allowed extensions: "
-            f"{', '.join(Config.ALLOWED_IMAGE_EXTENSIONS)}"
-        )
+    if not file.filename.lower().endswith(_ALLOWED_IMAGE_SUFFIXES):
+        return False, f"Invalid file type. Allowed extensions: {_ALLOWED_IMAGE_EXTENSIONS_TEXT}"
     
     return True, None
 
@@ -86,10 +91,8 @@ def validate_aspect_ratio(aspect_ratio: str) -> tuple[bool, Optional[str]]:
     Returns:
         Tuple of (is_valid, error_message)
     """
-    valid_ratios = {'16:9', '9:16', '1:1', 'Auto'}
-    
-    if aspect_ratio not in valid_ratios:
-        return False, f"Invalid aspect ratio. Allowed values: {', '.join(valid_ratios)}"
+    if aspect_ratio not in VALID_ASPECT_RATIOS:
+        return False, f"Invalid aspect ratio. Allowed values: {_VALID_ASPECT_RATIOS_TEXT}"
     
     return True, None
 
@@ -3,10 +3,17 @@ Veo 3.1 Video Generation Client
 Handles video generation requests and polling for completion status.
 """
 
+import logging
+import os
 import requests
+from requests.adapters import HTTPAdapter
+import random
 import time
-import json
-from typing import Optional, Dict, List
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
 
 
 class VeoVideoGenerator:
@@ -16,18 +23,43 @@ class VeoVideoGenerator:
     GENERATE_ENDPOINT = f"{BASE_URL}/generate"
     RECORD_INFO_ENDPOINT = f"{BASE_URL}/record-info"
     
-    def __init__(self, api_key: str):
+    # generate_and_wait first polls after this fraction of the usual duration
+    INITIAL_WAIT_FRACTION = 0.7
+    # Weight of the newest completion in the running average
+    COMPLETION_EMA_WEIGHT = 0.3
+    # wait_for_completion backs off to at most this many poll intervals
+    MAX_POLL_BACKOFF = 4
+    
+    def __init__(self, api_key: str, pool_size: int = 32):
         """
         Initialize the Veo Video Generator client.
         
         Args:
             api_key: Your Veo API key (Bearer token)
+            pool_size: Keep-alive connections kept open to the API, i.e. how
+                many concurrent requests reuse a connection
         """
         self.api_key = api_key
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
+        # One session so requests reuse TCP/TLS connections to the API
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        # Average seconds to completion per (model, generation_type)
+        self._completion_ema: Dict[Tuple[str, str], float] = {}
+    
+    def close(self) -> None:
+        """Close the pooled connections to the API."""
+        self.session.close()
+    
+    def __enter__(self) -> "VeoVideoGenerator":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
     
     @staticmethod
     def normalize_prompt(prompt: str) -> str:
@@ -40,11 +72,9 @@ class VeoVideoGenerator:
         Returns:
             Normalized prompt string with proper newlines
         """
-        # Replace literal \n sequences with actual newlines if they exist
-        # This handles cases where prompts are pasted with \n as text
-        if "\\n" in prompt:
-            prompt = prompt.replace("\\n", "\n")
-        return prompt.strip()
+        # Replace literal \n sequences with actual newlines (prompts pasted
+        # with \n as text); replace is a no-op scan when there are none
+        return prompt.replace("\\n", "\n").strip()
     
     def generate_video(
         self,
@@ -104,14 +134,13 @@ class VeoVideoGenerator:
         if callback_url:
             payload["callBackUrl"] = callback_url
         
-        response = requests.post(
+        response = self.session.post(
             self.GENERATE_ENDPOINT,
-            headers=self.headers,
-            json=payload
+            data=orjson.dumps(payload)
         )
         
         response.raise_for_status()
-        result = response.json()
+        result = orjson.loads(response.content)
         
         if result.get("code") != 200:
             raise Exception(f"API Error {result.get('code')}: {result.get('msg', 'Unknown error')}")
@@ -133,14 +162,13 @@ class VeoVideoGenerator:
         """
         params = {"taskId": task_id}
         
-        response = requests.get(
+        response = self.session.get(
             self.RECORD_INFO_ENDPOINT,
-            headers=self.headers,
             params=params
         )
         
         response.raise_for_status()
-        result = response.json()
+        result = orjson.loads(response.content)
         
         if result.get("code") != 200:
             raise Exception(f"API Error {result.get('code')}: {result.get('msg', 'Unknown error')}")
@@ -152,16 +180,33 @@ class VeoVideoGenerator:
         task_id: str,
         poll_interval: int = 10,
         max_wait_time: int = 600,
-        verbose: bool = True
+        verbose: bool = True,
+        base_delay: Optional[float] = None,
+        max_poll_interval: Optional[float] = None,
+        jitter: float = 0.2,
+        max_transient_errors: int = 3
     ) -> Dict:
         """
         Poll the API until video generation is complete.
         
+        The wait between polls starts at `base_delay` (by default
+        `poll_interval`, the fixed cadence) and doubles up to
+        `max_poll_interval`, so backoff only spaces later polls further
+        apart. Waits get random jitter so many waiting tasks don't
+        poll in lockstep. Polls for a task that isn't visible yet back off
+        twice as fast. Connection errors, timeouts and 5xx responses are
+        retried up to `max_transient_errors` times in a row; other errors
+        are raised immediately.
+        
         Args:
             task_id: The task ID to poll
-            poll_interval: Seconds between polling attempts (default: 10)
+            poll_interval: Wait before the second poll unless base_delay is set (default: 10)
             max_wait_time: Maximum time to wait in seconds (default: 600 = 10 minutes)
-            verbose: Print status updates (default: True)
+            verbose: Log status updates (default: True)
+            base_delay: Wait before the second poll in seconds (default: poll_interval)
+            max_poll_interval: Longest wait between polls (default: MAX_POLL_BACKOFF * poll_interval)
+            jitter: Fraction by which each wait is randomly varied (default: 0.2)
+            max_transient_errors: Consecutive network/server errors tolerated (default: 3)
             
         Returns:
             Dict containing completed task details with video URLs
@@ -171,9 +216,15 @@ class VeoVideoGenerator:
             Exception: If generation fails
         """
         start_time = time.time()
+        if base_delay is None:
+            base_delay = poll_interval
+        if max_poll_interval is None:
+            max_poll_interval = self.MAX_POLL_BACKOFF * poll_interval
+        attempt = 0
+        transient_errors = 0
         
         if verbose:
-            print(f"Polling task {task_id} for completion...")
+            logger.info("Polling task %s for completion...", task_id)
         
         while True:
             elapsed = time.time() - start_time
@@ -183,32 +234,48 @@ class VeoVideoGenerator:
             
             try:
                 details = self.get_video_details(task_id)
+                transient_errors = 0
                 
                 success_flag = details.get("successFlag")
                 
                 if success_flag == 1:
                     if verbose:
-                        print(f"✓ Video generation completed in {elapsed:.1f} seconds")
+                        logger.info("✓ Video generation completed in %.1f seconds", elapsed)
                     return details
                 elif success_flag == 0:
                     # Still processing
                     if verbose:
-                        print(f"⏳ Still processing... (elapsed: {elapsed:.1f}s)")
+                        logger.info("⏳ Still processing... (elapsed: %.1fs)", elapsed)
+                    attempt += 1
                 else:
                     # Failed
                     error_code = details.get("errorCode")
                     error_message = details.get("errorMessage", "Unknown error")
                     raise Exception(f"Video generation failed: {error_code} - {error_message}")
                 
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                status_code = getattr(e.response, 'status_code', None)
+                if status_code is not None and status_code < 500:
+                    raise
+                transient_errors += 1
+                if transient_errors > max_transient_errors:
+                    raise
+                logger.warning("Transient error polling task %s (%d/%d): %s",
+                               task_id, transient_errors, max_transient_errors, e)
+                attempt += 1
             except Exception as e:
                 if "record is null" in str(e) or "not success" in str(e).lower():
                     # Task might still be processing
                     if verbose:
-                        print(f"⏳ Task not ready yet... (elapsed: {elapsed:.1f}s)")
+                        logger.info("⏳ Task not ready yet... (elapsed: %.1fs)", elapsed)
+                    attempt += 2
                 else:
                     raise
             
-            time.sleep(poll_interval)
+            delay = min(max_poll_interval, base_delay * 2 ** min(attempt - 1, 16))
+            delay *= 1 + random.uniform(-jitter, jitter)
+            # Don't sleep past the deadline
+            time.sleep(max(0.0, min(delay, max_wait_time - (time.time() - start_time))))
     
     def generate_and_wait(
         self,
@@ -222,11 +289,19 @@ class VeoVideoGenerator:
         watermark: Optional[str] = None,
         poll_interval: int = 10,
         max_wait_time: int = 600,
-        verbose: bool = True
+        verbose: bool = True,
+        callback_url: Optional[str] = None
     ) -> Dict:
         """
         Generate a video and wait for completion in one call.
         
+        With a callback_url the API reports completion to that URL, so the
+        task is not polled and the generation result is returned at once.
+        
+        Once videos of the same model and generation type have completed,
+        polling starts only after most of their average duration, skipping
+        polls that would find the task still processing.
+        
         Args:
             prompt: Text prompt describing the desired video content
             image_urls: List of image URLs (1-3 images depending on generation_type)
@@ -238,13 +313,15 @@ class VeoVideoGenerator:
             watermark: Optional watermark text
             poll_interval: Seconds between polling attempts (default: 10)
             max_wait_time: Maximum time to wait in seconds (default: 600)
-            verbose: Print status updates (default: True)
+            verbose: Log status updates (default: True)
+            callback_url: URL notified by the API when the task finishes
             
         Returns:
-            Dict containing completed task details with video URLs
+            Dict containing completed task details with video URLs, or the
+            generation result (with taskId) if callback_url is set
         """
         if verbose:
-            print("🚀 Starting video generation...")
+            logger.info("🚀 Starting video generation...")
         
         # Generate video
         result = self.generate_video(
@@ -255,7 +332,8 @@ class VeoVideoGenerator:
             seeds=seeds,
             enable_translation=enable_translation,
             generation_type=generation_type,
-            watermark=watermark
+            watermark=watermark,
+            callback_url=callback_url
         )
         
         task_id = result.get("taskId")
@@ -263,125 +341,79 @@ class VeoVideoGenerator:
             raise Exception("No taskId returned from API")
         
         if verbose:
-            print(f"✓ Task created: {task_id}")
+            logger.info("✓ Task created: %s", task_id)
+        
+        if callback_url:
+            # Completion is delivered to the callback instead
+            return result
+        
+        key = (model, generation_type)
+        start_time = time.time()
+        expected = self._completion_ema.get(key)
+        if expected:
+            # Leave at least one poll interval of the budget for polling
+            initial_wait = min(
+                self.INITIAL_WAIT_FRACTION * expected,
+                max(0.0, max_wait_time - poll_interval)
+            )
+            if verbose:
+                logger.info("Waiting %.0fs before polling (usual duration: %.0fs)", initial_wait, expected)
+            time.sleep(initial_wait)
         
         # Wait for completion
-        return self.wait_for_completion(
+        details = self.wait_for_completion(
             task_id=task_id,
             poll_interval=poll_interval,
-            max_wait_time=max_wait_time,
+            max_wait_time=max_wait_time - (time.time() - start_time),
             verbose=verbose
         )
+        
+        elapsed = time.time() - start_time
+        weight = self.COMPLETION_EMA_WEIGHT
+        self._completion_ema[key] = elapsed if expected is None else weight * elapsed + (1 - weight) * expected
+        return details
+    
+    def generate_and_wait_many(
+        self,
+        jobs: List[Dict[str, Any]],
+        max_workers: int = 8
+    ) -> List[Dict]:
+        """
+        Generate several videos concurrently and wait for all of them.
+        
+        Each job runs generate_and_wait on a worker thread; all of them
+        share this client's pooled connections, and the jittered polling
+        backoff keeps their status checks from bunching up.
+        
+        Args:
+            jobs: Keyword arguments for generate_and_wait, one dict per video
+            max_workers: Maximum number of videos generated at once (default: 8)
+            
+        Returns:
+            Completed task details for each job, in the order of `jobs`
+            
+        Raises:
+            Exception: The first job's error, once every job has finished
+        """
+        if not jobs:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+            futures = [executor.submit(self.generate_and_wait, **job) for job in jobs]
+        return [future.result() for future in futures]
 
 
 def main():
     """Example usage of the Veo Video Generator."""
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format='%(message)s')
+    
     # Initialize client with your API key
     API_KEY = "d9b6abd85b76487369acdf2cbab1fd8e"
     generator = VeoVideoGenerator(API_KEY)
     
-    # Example: Multi-line prompt (use triple quotes for multi-line strings)
-    # You can paste your prompt directly between the triple quotes
-    prompt = """SCENE_DESCRIPTION:
-
-Neha drops onto a sofa inside a busy mall lounge, visibly exhausted. Her arms rest limply by her sides amid a pile of shopping bags from Zara, H&M, and Sephora. She leans slightly forward, looking dazed. Riya stands nearby, relaxed, arms loosely crossed, looking down at Neha with a half-smile.
-
-Motion begins as Neha exhales deeply and slumps into the seat, then raises her head to speak in a tired tone. Riya shifts her weight casually, smirking slightly, and gives a casual reply with a short head tilt. The mall remains softly blurred in the background, filled with warm retail lighting.
-
-Camera is locked in a slightly wide portrait shot, showing both characters fully with shopping bags in foreground. No camera motion.
-
-REFERENCE_IMAGE:
-
-reference_image_2.jpeg (first frame of Scene 2)
-
-CHARACTER_DNA:
-
-Neha
-
-Appearance: South Asian, 26, slim build, shoulder-length dark hair, same pink outfit as Scene 1
-
-Voice: Mid-pitched, slightly tired, showing money-related stress
-
-Camera Settings: Frontal mid-wide, portrait 9:16, seated with downward-leaning posture
-
-Riya
-
-Appearance: South Asian, 27, medium build, short dark hair, same teal-blue kurta and dupatta as Scene 1
-
-Voice: Practical, warm, upbeat
-
-Camera Settings: Standing, right side of Neha, arms at ease, confident posture
-
-AUDIO_IDENTITY:
-
-Neha
-
-Voice Type: Female, South Asian accent, age 26, natural tone
-
-Pitch: Medium-high
-
-Tone: Tired, stressed, subdued
-
-Delivery Style: Slower than Scene 1, voice drops slightly at the end
-
-Emotional Markers: Audible sigh before speaking, "stress" pronounced heavier
-
-Speech Rhythm: Sluggish start, quickens on "saare kharchon"
-
-Lip Sync Reference Line: "Woh to hai… par ek saath itne saare kharchon ka soch ke hi stress ho raha hai."
-
-Riya
-
-Voice Type: Female, South Asian accent, age 27, confident and grounded
-
-Pitch: Medium
-
-Tone: Casual, slightly playful
-
-Delivery Style: Friendly, mildly teasing
-
-Emotional Markers: Quick beat before "try kar na", suggesting spontaneity
-
-Speech Rhythm: Light and conversational
-
-Lip Sync Reference Line: "Toh Insta EMI Card try kar na."
-
-DIALOGUE:
-
-Neha (fatigued, slightly slouched): "Woh to hai… par ek saath itne saare kharchon ka soch ke hi stress ho raha hai."
-Riya (casual, smiling): "Toh Insta EMI Card try kar na."
-
-Lip-Sync Specifications:
-
-Phoneme-accurate mouth animation ("map each syllable to jaw and lip contours, sync within ±50 ms")
-
-Expression Timing: "brief micro-expressions on key words, maintain neutral rest between sentences"
-
-AUDIO_CUES:
-
-Sound Effects: faint mall ambiance, bag rustle as Neha sits
-
-Background Music: None
-
-Ambient Noise: distant foot traffic, indistinct murmurs from shops
-
-TECHNICAL_SPECIFICATIONS:
-
-Resolution: 1080p
-
-Frame Rate: 24fps
-
-Aspect Ratio: 9:16 portrait
-
-Duration: 6 seconds
-
-Lighting: Mall interior lighting, warm and diffused
-
-Color Grading: Soft warm retail tones with slight contrast lift on midtones
-
-NEGATIVE_PROMPT_ELEMENTS:
-
-blurry, distortion, low quality, watermark, mis-synced lips, jerky animation, floating shopping bags, flickering lights, cartoonish skin, incorrect bag labels, shadow inconsistency"""
+    # Example multi-line prompt, read only when the example runs
+    prompt_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts", "scene2.txt")
+    with open(prompt_path, encoding="utf-8") as f:
+        prompt = f.read()
     
     image_urls = [
         "https://unaiorgdata.blob.core.windows.net/unai-public/prajwal/veo_3_testing/_positive_prompt_202601091312.jpeg"